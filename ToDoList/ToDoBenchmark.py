@@ -0,0 +1,315 @@
+'''
+Benchmarks for DatabaseManager, ToDoLogic, ToDoEntry and the listbox render path.
+
+Runs headless against a temporary database and prints the results as JSON,
+so two runs can be compared with --compare.
+The render benchmark needs a display, it starts Xvfb if there is no DISPLAY and Xvfb is installed,
+otherwise it is skipped.
+
+    python ToDoBenchmark.py --sizes 1000,10000,100000 --output before.json
+    python ToDoBenchmark.py --output after.json --compare before.json
+    python ToDoBenchmark.py --sizes 1000 --no-render --server-clients 8 --server-ops 500
+'''
+import argparse
+import itertools
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from types import MappingProxyType
+from typing import Callable
+
+from ToDoCore import DatabaseManager, ToDoEntry, ToDoLogic
+
+def time_calls(func: Callable, repeat: int) -> dict:
+    '''
+    Calls func repeat times and summarises how long each call took
+
+    Args:
+        func(Callable): function without arguments
+        repeat(int): how many times to call it
+
+    Returns:
+        dict: median/p95/min/max in milliseconds
+    '''
+    samples: list[float] = []
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {"median_ms": round(statistics.median(samples), 4),
+            "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+            "min_ms": round(samples[0], 4),
+            "max_ms": round(samples[-1], 4),
+            "calls": repeat}
+
+def make_entry(number: int) -> MappingProxyType:
+    return MappingProxyType({"title": f"Task {number}"[:20],
+                             "info": f"Benchmark entry {number}",
+                             "date": int(datetime.now().timestamp()),
+                             "is_done": number % 3 == 0})
+
+def use_database(path: str):
+    '''
+    Points DatabaseManager at path, closing the connection to the previous database
+    '''
+    DatabaseManager.close_connection()
+    DatabaseManager.DATABASE_PATH = path
+    DatabaseManager.open_connection()
+    DatabaseManager.verify_db()
+
+def bench_database(size: int, repeat: int) -> dict:
+    '''
+    Single row write latency and full table read time on a table with size rows
+    '''
+    ids: list[int] = []
+
+    def add():
+        ids.append(DatabaseManager.add_entry(make_entry(len(ids)))[1])
+
+    results: dict = {"add_entry": time_calls(add, repeat)}
+    toggle_ids = iter(ids)
+    results["change_done_status"] = time_calls(lambda: DatabaseManager.change_done_status(next(toggle_ids), True), repeat)
+    delete_ids = iter(ids)
+    results["delete_entry"] = time_calls(lambda: DatabaseManager.delete_entry(next(delete_ids)), repeat)
+    results["get_entries"] = time_calls(DatabaseManager.get_entries, max(3, repeat // 20))
+    results["get_entries_page"] = time_calls(lambda: DatabaseManager.get_entries_after(size // 2, 100), repeat)
+    results["get_view_open_by_title"] = time_calls(lambda: DatabaseManager.get_view("title", False, limit=100), repeat)
+    results["get_view_done_by_date"] = time_calls(lambda: DatabaseManager.get_view("date", True, limit=100), repeat)
+    return results
+
+def bench_bulk(size: int) -> dict:
+    '''
+    Batched writes over the whole table
+    '''
+    ids: list[int] = [row[0] for row in DatabaseManager.get_entries()[1]]
+    return {"set_done_status_all": time_calls(lambda: DatabaseManager.set_done_status(ids, False), 1),
+            "add_entries": time_calls(lambda: DatabaseManager.add_entries(make_entry(number) for number in range(size)), 1)}
+
+def bench_logic(repeat: int) -> dict:
+    '''
+    ToDoLogic reload and mutation cost with a stub callback in place of the GUI
+    '''
+    results: dict = {}
+    for name, page_size in (("full", 0), ("paged", 100)):
+        logic: ToDoLogic = ToDoLogic(lambda change, indices: None, print, page_size=page_size)
+        results[f"update_entry_list_{name}"] = time_calls(logic.update_entry_list, max(3, repeat // 20))
+        results[f"get_entry_display_strings_{name}"] = time_calls(logic.get_entry_display_strings, max(3, repeat // 20))
+        results[f"change_entry_status_{name}"] = time_calls(lambda: logic.change_entry_status(0, not logic.get_done_status(0)), repeat)
+    return results
+
+def bench_entries(size: int) -> dict:
+    '''
+    ToDoEntry construction, memory and display string cost
+    '''
+    import tracemalloc
+    rows: list[tuple] = [(number, 0, f"Task {number}", "", number % 3 == 0) for number in range(size)]
+    tracemalloc.start()
+    start: float = time.perf_counter()
+    entries: list[ToDoEntry] = [ToDoEntry(*row) for row in rows]
+    build_ms: float = (time.perf_counter() - start) * 1000
+    memory: int = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return {"build_ms": round(build_ms, 4),
+            "bytes_per_entry": round(memory / size, 1),
+            "display_first": time_calls(lambda: [str(entry) for entry in entries], 1),
+            "display_cached": time_calls(lambda: [str(entry) for entry in entries], 3)}
+
+def ensure_display() -> subprocess.Popen:
+    '''
+    Starts Xvfb when there is no display to render on
+
+    Returns:
+        subprocess.Popen: the Xvfb process to stop later, None if it wasnt needed or isnt installed
+    '''
+    if os.environ.get("DISPLAY") or shutil.which("Xvfb") is None:
+        return None
+    display: str = ":97"
+    process: subprocess.Popen = subprocess.Popen(["Xvfb", display, "-screen", "0", "800x600x24"],
+                                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ["DISPLAY"] = display
+    time.sleep(0.5) # giving it time to accept connections
+    return process
+
+def bench_render(repeat: int) -> dict:
+    '''
+    Time spent in ToDoGUI.reload_list for a full load of the window and for no-change reloads
+    '''
+    try:
+        from ToDoGUI import ToDoGUI
+
+        class TimedGUI(ToDoGUI):
+            def __init__(self):
+                self.reload_times: list[tuple[str, float]] = []
+                super().__init__()
+
+            def reload_list(self, change: str = ToDoLogic.CHANGE_RELOAD, indices: tuple[int] = ()):
+                start: float = time.perf_counter()
+                super().reload_list(change, indices)
+                self.reload_times.append((change, (time.perf_counter() - start) * 1000))
+
+        gui: TimedGUI = TimedGUI()
+    except Exception as ex: # no display
+        return {"skipped": str(ex)}
+
+    def reload_and_wait():
+        count: int = len(gui.reload_times)
+        gui.refresh()
+        while len(gui.reload_times) == count:# results come back from the worker thread through Tk.after
+            gui.update()
+
+    reload_and_wait()
+    results: dict = {"first_reload_ms": round(gui.reload_times[-1][1], 4)}
+    reload_and_wait()
+    results["unchanged_reload"] = time_calls(lambda: gui.reload_list(), repeat)
+    gui.destroy()
+    return results
+
+def bench_server(clients: int, ops: int) -> dict:
+    '''
+    Load test for ToDoServer, clients threads each make ops calls(add, toggle, page read) at the same time.
+    Every client rebuilds the table from the change feed alone, they all have to end up equal to the database
+    '''
+    from ToDoServer import ToDoServer, RemoteDatabase
+    server: ToDoServer = ToDoServer("127.0.0.1:0")
+    server_thread: threading.Thread = threading.Thread(target=server.run, daemon=True)
+    server_thread.start()
+    address: str = server.get_address()
+    samples: list[list[float]] = [[] for _ in range(clients)]
+    mirrors: list[dict] = [{} for _ in range(clients)] # _ID -> row, from change events only
+    databases: list[RemoteDatabase] = []
+    for client in range(clients):
+        database: RemoteDatabase = RemoteDatabase(address)
+
+        def listener(change: str, payload: list, mirror: dict = mirrors[client]):
+            if change == ToDoLogic.CHANGE_DELETE:
+                for id in payload:
+                    mirror.pop(id, None)
+            elif payload is not None:
+                mirror.update((row[0], tuple(row)) for row in payload)
+        database.set_change_listener(listener)
+        database.open_connection()
+        databases.append(database)
+
+    def work(client: int):
+        database: RemoteDatabase = databases[client]
+        ids: list[int] = []
+        for number in range(ops):
+            start: float = time.perf_counter()
+            if number % 3 == 0 or not ids:
+                ids.append(database.add_entry(make_entry(number))[1])
+            elif number % 3 == 1:
+                database.set_done_status([ids[number % len(ids)]], number % 2 == 0)
+            else:
+                database.get_entries_after(0, 100)
+            samples[client].append((time.perf_counter() - start) * 1000)
+
+    threads: list[threading.Thread] = [threading.Thread(target=work, args=(client,)) for client in range(clients)]
+    start: float = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed: float = time.perf_counter() - start
+    time.sleep(0.2) # last change events still on their way
+    expected: dict = {row[0]: tuple(row) for row in databases[0].get_entries()[1]}
+    for database in databases:
+        database.close_connection()
+    server.stop()
+    server_thread.join()
+
+    latencies: list[float] = sorted(itertools.chain.from_iterable(samples))
+    return {"clients": clients,
+            "calls": len(latencies),
+            "calls_per_second": round(len(latencies) / elapsed, 1),
+            "median_ms": round(statistics.median(latencies), 4),
+            "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 4),
+            "max_ms": round(latencies[-1], 4),
+            "converged": all(mirror == expected for mirror in mirrors)}
+
+def run(sizes: list[int], repeat: int, render: bool, server_clients: int = 0, server_ops: int = 0) -> dict:
+    report: dict = {"timestamp": datetime.now().isoformat(timespec="seconds"),
+                    "python": platform.python_version(),
+                    "sqlite": sqlite3.sqlite_version,
+                    "platform": platform.platform(),
+                    "repeat": repeat,
+                    "sizes": {}}
+    xvfb: subprocess.Popen = ensure_display() if render else None
+    try:
+        for size in sizes:
+            with tempfile.TemporaryDirectory() as directory:
+                use_database(os.path.join(directory, "Benchmark.db"))
+                DatabaseManager.add_entries(make_entry(number) for number in range(size))
+                result: dict = {"database": bench_database(size, repeat),
+                                "logic": bench_logic(repeat),
+                                "entries": bench_entries(size)}
+                if render:
+                    result["render"] = bench_render(repeat)
+                result["bulk"] = bench_bulk(size)
+                DatabaseManager.close_connection()
+            report["sizes"][str(size)] = result
+        if server_clients > 0:
+            with tempfile.TemporaryDirectory() as directory:
+                DatabaseManager.DATABASE_PATH = os.path.join(directory, "Server.db") # the server opens its own connection
+                report["server"] = bench_server(server_clients, server_ops)
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+    return report
+
+def flatten(report: dict, prefix: str = "") -> dict:
+    '''
+    Turns the nested report into {"size.group.metric.stat": value} for comparing
+    '''
+    flat: dict = {}
+    for key, value in report.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, float) and key.endswith("ms"):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+def compare(report: dict, baseline: dict):
+    '''
+    Prints the ratio new/old for every timing that is in both reports, slower ones first
+    '''
+    new: dict = flatten(report)
+    old: dict = flatten(baseline)
+    ratios: list[tuple[float, str]] = [(new[key] / old[key], key) for key in new if key in old and old[key] > 0]
+    for ratio, key in sorted(ratios, reverse=True):
+        print(f"{ratio:7.2f}x  {key}", file=sys.stderr)
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description="ToDoList performance benchmarks")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma separated table sizes")
+    parser.add_argument("--repeat", type=int, default=200, help="calls per latency measurement")
+    parser.add_argument("--no-render", action="store_true", help="skip the Tk render benchmark")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="JSON report of an earlier run to compare against")
+    parser.add_argument("--server-clients", type=int, default=0, help="concurrent clients for the ToDoServer load test, DEFAULT 0 = skip it")
+    parser.add_argument("--server-ops", type=int, default=500, help="calls per client in the server load test")
+    args = parser.parse_args(argv)
+
+    report: dict = run([int(size) for size in args.sizes.split(",")], args.repeat, not args.no_render,
+                       args.server_clients, args.server_ops)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare) as file:
+            compare(report, json.load(file))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+'''
+Command line interface for the ToDo list, for scripts and cron jobs.
+Only uses ToDoCore so it starts without importing tkinter or needing a display.
+
+    python ToDoList.py add "Buy milk" --info "2 litres"
+    python ToDoList.py list --open
+    python ToDoList.py done 4 7
+    python ToDoList.py rm 4
+    python ToDoList.py export backup.csv
+    python ToDoList.py import backup.jsonl --dry-run
+    python ToDoList.py serve --address unix:/tmp/todo.sock
+    python ToDoList.py gui --server unix:/tmp/todo.sock
+    python ToDoList.py --metrics metrics.json gui
+    python ToDoList.py archive --days 30 --vacuum
+    python ToDoList.py restore 12 15
+    python ToDoList.py report --period week --days 90
+'''
+import argparse
+import json
+import sys
+from datetime import datetime
+from types import MappingProxyType
+from typing import TextIO
+
+from ToDoCore import DatabaseManager, ToDoLogic
+import ToDoMetrics
+
+def format_row(row: tuple) -> str:
+    '''
+    Args:
+        row(tuple): database row
+
+    Returns:
+        str: one line for the list command, id, done mark and title
+    '''
+    return f"{row[0]}\t[{'x' if row[4] else ' '}] {row[2]}"
+
+def command_add(args: argparse.Namespace) -> int:
+    if not ToDoLogic.is_valid_title(args.title):
+        print(f"Title lenght has to be between 1 and {ToDoLogic.TITLE_MAX_LENGTH}", file=sys.stderr)
+        return 1
+    successful, new_id = DatabaseManager.add_entry(MappingProxyType({"title": args.title,
+                                                                     "info": args.info,
+                                                                     "date": int(datetime.now().timestamp()),
+                                                                     "is_done": args.done}))
+    if not successful:
+        print("Failed To Add Entry", file=sys.stderr)
+        return 1
+    print(new_id)
+    return 0
+
+def command_list(args: argparse.Namespace) -> int:
+    # filtered in SQL, done entries never get read for --open
+    successful, rows = DatabaseManager.get_view(is_done=False if args.open else True if args.done else None)
+    if not successful:
+        print("Failed To Get Entry", file=sys.stderr)
+        return 1
+    if rows:
+        sys.stdout.write("\n".join(map(format_row, rows)) + "\n")# one write instead of one print per row
+    return 0
+
+def command_done(args: argparse.Namespace) -> int:
+    if not DatabaseManager.set_done_status(args.ids, not args.undo):
+        print("Failed To Update Entries", file=sys.stderr)
+        return 1
+    return 0
+
+def command_rm(args: argparse.Namespace) -> int:
+    if not DatabaseManager.delete_entries(args.ids):
+        print("Failed To Remove Entries", file=sys.stderr)
+        return 1
+    return 0
+
+def command_import(args: argparse.Namespace) -> int:
+    import ToDoTransfer # imported here so the quick commands dont load csv/json
+    file_format: str = args.format or ToDoTransfer.guess_format(args.file)
+    
+    def progress(records: int, written: int):
+        print(f"{records} records done, {written} entries {'valid' if args.dry_run else 'written'}", file=sys.stderr)
+    
+    def on_invalid(record: int, reason: str):
+        print(f"record {record}: {reason}", file=sys.stderr)
+    
+    file: TextIO = sys.stdin if args.file == "-" else open(args.file, encoding="utf-8", newline="")
+    try:
+        successful, written, invalid = ToDoTransfer.import_entries(file, 
+                                                                   file_format, 
+                                                                   start_record=args.start_record,
+                                                                   batch_size=args.batch_size,
+                                                                   dry_run=args.dry_run,
+                                                                   progress=progress if args.progress else None,
+                                                                   on_invalid=on_invalid)
+    finally:
+        if file is not sys.stdin:
+            file.close()
+    if not successful:
+        print("Failed To Add Entries, use --start-record with the last reported records done to continue", file=sys.stderr)
+        return 1
+    print(written)
+    return 0 if invalid == 0 else 2
+
+def command_export(args: argparse.Namespace) -> int:
+    import ToDoTransfer
+    file_format: str = args.format or ToDoTransfer.guess_format(args.file)
+    
+    def progress(rows: int, last_id: int):
+        print(f"{rows} entries written, last id {last_id}", file=sys.stderr)
+    
+    # appending when continuing, so the already exported part is kept
+    file: TextIO = sys.stdout if args.file == "-" else open(args.file, "a" if args.after_id else "w", encoding="utf-8", newline="")
+    try:
+        successful, written = ToDoTransfer.export_entries(file, 
+                                                          file_format, 
+                                                          after_id=args.after_id,
+                                                          batch_size=args.batch_size,
+                                                          progress=progress if args.progress else None)
+    finally:
+        if file is not sys.stdout:
+            file.close()
+    if not successful:
+        print("Failed To Get Entry, use --after-id with the last reported id to continue", file=sys.stderr)
+        return 1
+    return 0
+
+def command_archive(args: argparse.Namespace) -> int:
+    def progress(moved: int):
+        print(f"{moved} entries archived", file=sys.stderr)
+    
+    successful, ids = DatabaseManager.archive_done(int(args.days * 24 * 60 * 60), args.batch_size, progress if args.progress else None)
+    print(len(ids))
+    if not successful:
+        print("Failed To Archive Entries, run it again to continue", file=sys.stderr)
+        return 1
+    if (args.vacuum or args.full_vacuum) and not DatabaseManager.vacuum(args.full_vacuum):
+        print("Failed To Vacuum", file=sys.stderr)
+        return 1
+    return 0
+
+def command_archived(args: argparse.Namespace) -> int:
+    successful, rows = DatabaseManager.get_archived(args.after_id, args.limit)
+    if not successful:
+        print("Failed To Get Archive", file=sys.stderr)
+        return 1
+    if rows:
+        sys.stdout.write("\n".join(map(format_row, rows)) + "\n")
+    return 0
+
+def command_restore(args: argparse.Namespace) -> int:
+    successful, rows = DatabaseManager.restore_archived(args.ids)
+    if not successful:
+        print("Failed To Restore Entries", file=sys.stderr)
+        return 1
+    if rows:# ids can change when a new entry took the old one
+        sys.stdout.write("\n".join(map(format_row, rows)) + "\n")
+    return 0
+
+def command_report(args: argparse.Namespace) -> int:
+    import ToDoReport # process pool and all, only loaded for this command
+    successful, report = ToDoReport.build_report(args.period, args.days, args.top, args.workers, args.cache)
+    if not successful:
+        print("Failed To Build Report", file=sys.stderr)
+        return 1
+    print(json.dumps(report, indent=2) if args.json else ToDoReport.format_report(report))
+    return 0
+
+def command_serve(args: argparse.Namespace) -> int:
+    from ToDoServer import ToDoServer, is_local_address
+    if not is_local_address(args.address):
+        print(f"Warning: {args.address} can be reached from other machines, the server has no authentication "
+              "and lets anyone connecting delete entries", file=sys.stderr)
+    server: ToDoServer = ToDoServer(args.address)
+    try:
+        server.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def command_gui(args: argparse.Namespace) -> int:
+    from ToDoGUI import ToDoGUI
+    if args.server is None:
+        ToDoGUI().start()
+        return 0
+    from ToDoServer import RemoteDatabase
+    database: RemoteDatabase = RemoteDatabase(args.server)
+    if not database.open_connection():
+        print(f"Cant connect to {args.server}", file=sys.stderr)
+        return 1
+    ToDoGUI(database).start()
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="ToDoList", description="ToDo list from the command line, run without arguments for the GUI")
+    parser.add_argument("--db", default=DatabaseManager.DATABASE_PATH, help="database file")
+    parser.add_argument("--metrics", metavar="FILE", help="record timings and counters, written to FILE as JSON")
+    parser.add_argument("--metrics-interval", type=float, default=10, help="seconds between --metrics writes for long running commands")
+    parser.set_defaults(verify=True)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="add an entry, prints its id")
+    add.add_argument("title")
+    add.add_argument("-i", "--info", default="")
+    add.add_argument("--done", action="store_true", help="add it as already done")
+    add.set_defaults(func=command_add)
+
+    list_parser = commands.add_parser("list", help="list entries")
+    status = list_parser.add_mutually_exclusive_group()
+    status.add_argument("--open", action="store_true", help="only entries that are not done")
+    status.add_argument("--done", action="store_true", help="only done entries")
+    list_parser.set_defaults(func=command_list)
+
+    done = commands.add_parser("done", help="mark entries done")
+    done.add_argument("ids", type=int, nargs="+")
+    done.add_argument("--undo", action="store_true", help="mark them not done instead")
+    done.set_defaults(func=command_done)
+
+    rm = commands.add_parser("rm", help="remove entries")
+    rm.add_argument("ids", type=int, nargs="+")
+    rm.set_defaults(func=command_rm)
+
+    import_parser = commands.add_parser("import", help="add entries from a JSON lines or CSV file, - for stdin")
+    import_parser.add_argument("file")
+    import_parser.add_argument("--format", choices=("jsonl", "csv"), help="DEFAULT from the file extension")
+    import_parser.add_argument("--batch-size", type=int, default=1000, help="records per transaction")
+    import_parser.add_argument("--start-record", type=int, default=0, help="skip this many records, to continue an interrupted import")
+    import_parser.add_argument("--dry-run", action="store_true", help="only validate the file")
+    import_parser.add_argument("--progress", action="store_true", help="report progress after every batch")
+    import_parser.set_defaults(func=command_import)
+
+    export = commands.add_parser("export", help="write all entries as JSON lines or CSV, - for stdout")
+    export.add_argument("file")
+    export.add_argument("--format", choices=("jsonl", "csv"), help="DEFAULT from the file extension")
+    export.add_argument("--batch-size", type=int, default=1000, help="rows read at a time")
+    export.add_argument("--after-id", type=int, default=0, help="only entries after this id, appends to file, to continue an interrupted export")
+    export.add_argument("--progress", action="store_true", help="report progress after every batch")
+    export.set_defaults(func=command_export)
+
+    archive = commands.add_parser("archive", help="move entries done for a while out of the list into the archive, prints how many")
+    archive.add_argument("--days", type=float, default=30, help="done for at least this many days")
+    archive.add_argument("--batch-size", type=int, default=500, help="entries moved per transaction")
+    archive.add_argument("--progress", action="store_true", help="report progress after every batch")
+    vacuum = archive.add_mutually_exclusive_group()
+    vacuum.add_argument("--vacuum", action="store_true", help="give the freed space back afterwards(incremental after the first time)")
+    vacuum.add_argument("--full-vacuum", action="store_true", help="rebuild the whole database file afterwards")
+    archive.set_defaults(func=command_archive)
+
+    archived = commands.add_parser("archived", help="list archived entries")
+    archived.add_argument("--after-id", type=int, default=0, help="start after this id, for the next page")
+    archived.add_argument("--limit", type=int, default=100)
+    archived.set_defaults(func=command_archived)
+
+    restore = commands.add_parser("restore", help="move archived entries back, prints them with their ids")
+    restore.add_argument("ids", type=int, nargs="+")
+    restore.set_defaults(func=command_restore)
+
+    report = commands.add_parser("report", help="completion per day/week, backlog age, longest open entries and most used words")
+    report.add_argument("--period", choices=("day", "week"), default="day", help="completion buckets")
+    report.add_argument("--days", type=int, default=30, help="completion for this many days back, 0 for all")
+    report.add_argument("--top", type=int, default=10, help="longest open entries and words to list")
+    report.add_argument("--workers", type=int, help="processes for the text analysis of big tables, DEFAULT one per CPU")
+    report.add_argument("--cache", metavar="FILE", help="keep the report in FILE, its reused until the database changes")
+    report.add_argument("--json", action="store_true", help="print the report as JSON")
+    report.set_defaults(func=command_report)
+
+    # these open the database themselves(or dont use a local one at all)
+    serve = commands.add_parser("serve", help="share the database with other ToDoList windows on this machine")
+    serve.add_argument("--address", default="127.0.0.1:8765",
+                       help="host:port or unix:/path to listen on, unauthenticated so keep it on 127.0.0.1 or a unix socket")
+    serve.set_defaults(func=command_serve, verify=False)
+
+    gui = commands.add_parser("gui", help="open the window, on a shared database with --server")
+    gui.add_argument("--server", help="host:port or unix:/path of a running serve")
+    gui.set_defaults(func=command_gui, verify=False)
+    return parser
+
+def main(argv: list[str]) -> int:
+    '''
+    Runs one command
+
+    Args:
+        argv(list[str]): command line arguments without the program name
+
+    Returns:
+        int: exit code
+    '''
+    args = build_parser().parse_args(argv)
+    DatabaseManager.DATABASE_PATH = args.db
+    metrics: ToDoMetrics.Metrics = None
+    if args.metrics:
+        metrics = ToDoMetrics.enable()
+        metrics.start_dumping(args.metrics, args.metrics_interval)
+    try:
+        if args.verify and not DatabaseManager.verify_db():
+            print("Database Verification Issue", file=sys.stderr)
+            return 1
+        return args.func(args)
+    finally:
+        DatabaseManager.close_connection()
+        if metrics is not None:
+            ToDoMetrics.disable()
+            metrics.dump(args.metrics) # final numbers, short commands end before the first periodic write
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,2296 @@
+from types import MappingProxyType #MappingProxyType is a immutable dictionary
+from typing import Callable, Iterable, Iterator # for hinting a fucntion as parameter
+from datetime import datetime
+import sqlite3# local database
+import re
+import itertools
+import json
+import threading # per thread database connections
+import queue # jobs for the database worker thread
+import time
+from collections import OrderedDict # LRU cache for info
+import ToDoMetrics # opt-in instrumentation, off unless ToDoMetrics.enable() is called
+
+class ToDoEntry():
+    # no per instance __dict__, large lists keep one of these per row
+    __slots__ = ("__id", "__creation_date", "__title", "__info", "__is_done", "__display")
+    
+    def __init__(self, id:int, date:int, title: str, info:str = "", isDone:bool = False):
+        '''
+        Args:
+            id(int): local db _ID
+            date(int): entry creation date, unix epoch seconds
+            title(str)
+            info(str): extra information, None when it wasnt loaded(list querries leave it out)
+        '''
+        self.__id: int = id
+        self.__creation_date: int = date
+        self.__title: str = title
+        self.__info: str = info  
+        self.__is_done: bool = isDone
+        self.__display: str = None # memoized __str__, cleared when the title or done state changes
+        
+    def get_id(self) -> int:
+        '''
+        Getter for id
+        
+        Returns:
+            int: local databse id
+        '''
+        return self.__id
+        
+    def get_creation_date(self) -> datetime:
+        '''
+        Getter for creation date
+        
+        Returns:
+            datetime: local time the entry was created
+        '''
+        return datetime.fromtimestamp(self.__creation_date)
+    
+    def get_timestamp(self) -> int:
+        '''
+        Getter for the raw creation date, compares the same way the date column does
+        
+        Returns:
+            int: unix epoch seconds
+        '''
+        return self.__creation_date
+        
+    def get_title(self) -> str:
+        '''
+        Getter for title
+        
+        Returns:
+            str
+        '''
+        return self.__title
+    
+    def get_info(self) -> str:
+        '''
+        Getter for info
+        
+        Returns:
+            str: None if the entry came from a list querry, see ToDoLogic.get_entry_info
+        '''
+        return self.__info
+    
+    def set_info(self, info: str):
+        '''
+        Setter for info, for entries whose info is needed after all
+        
+        Args:
+            info(str): extra information
+        '''
+        self.__info = info
+    
+    def __str__(self) -> str:
+        '''
+        override to string method 
+        using it for GUI display string
+        
+        Returns:
+            str: title string , crossed out if is_done set to true
+        '''
+        if self.__display is None:
+            temp:str = f"{self.__title}"
+            if self.__is_done:
+               temp ='\u0337'+ '\u0337'.join(temp)+'\u0337'
+            self.__display = temp
+        return self.__display
+        
+    def is_done(self) -> bool:
+        '''
+        Getter for completed stated
+        
+        Returns:
+            bool
+        '''
+        return self.__is_done
+    
+    def set_done(self, status: bool):
+        '''
+        Setter for completed state
+        
+        Args:
+            status(bool): new completed state
+        '''
+        if bool(status) != bool(self.__is_done):
+            self.__display = None
+        self.__is_done = status
+    
+    def set_id(self, id: int):
+        '''
+        Setter for id, entries added optimistically get their id once the database write is done
+        
+        Args:
+            id(int): local databse id
+        '''
+        self.__id = id
+        
+class DatabaseManager:
+    '''
+    Statsic class that manages the local database(SQLite) connection/querries
+    
+    Keeps one long lived connection per thread instead of reconnecting for every querry.
+    Use open_connection()/close_connection() to control the connection lifecycle,
+    execure_sql_querry will open one on demand if it wasnt opened explicitly.
+    '''
+    DATABASE_PATH:str = "ToDoDatabase.db"
+    MAIN_TABLE:str = "Entries"
+    MAX_ID:int = 2**63 - 1 # biggest value an INTEGER PRIMARY KEY can hold
+    TOMBSTONE_KEEP:int = 10000 # revisions of delete tombstones kept for get_changes_since, readers further behind reload
+    ENTRY_COLUMNS:str = "_ID, date, title, info, is_done" # full rows, in ToDoEntry argument order
+    # what the list querries return, same order but info is left out(NULL) since the list only shows titles, see get_info.
+    # date stays for the date view and its cursors
+    LIST_COLUMNS:str = "_ID, date, title, NULL, is_done"
+    # get_view orders and the columns they sort by, _ID last so the order is total and works as a keyset cursor
+    VIEW_ORDERS: MappingProxyType = MappingProxyType({
+        "id": ("_ID",),
+        "date": ("date", "_ID"),
+        "title": ("title", "_ID"),
+        })
+    
+    # Schema changes, applied in order by verify_db. PRAGMA user_version stores how many are applied.
+    # Only ever append to this, {table} gets replaced with the table name
+    SCHEMA_MIGRATIONS: tuple[str] = (
+        # 1: original schema
+        '''CREATE TABLE IF NOT EXISTS {table}(_ID INTEGER PRIMARY KEY NOT NULL,date TEXT NOT NULL, title TEXT NOT NULL,info TEXT,is_done BOOL NOT NULL);''',
+        # 2: date as integer unix epoch instead of the text sqlite3 adapted datetime into, plus indexes for filtered/sorted views.
+        # Old dates are local time text, the 'utc' modifier converts them from local time. Unreadable dates get the migration time
+        '''CREATE TABLE {table}_new(_ID INTEGER PRIMARY KEY NOT NULL,date INTEGER NOT NULL, title TEXT NOT NULL,info TEXT,is_done BOOL NOT NULL);
+        INSERT INTO {table}_new(_ID, date, title, info, is_done)
+            SELECT _ID,
+                   CASE WHEN typeof(date) = 'integer' THEN date
+                        ELSE IFNULL(CAST(strftime('%s', date, 'utc') AS INTEGER), CAST(strftime('%s', 'now') AS INTEGER)) END,
+                   title, info, is_done
+            FROM {table};
+        DROP TABLE {table};
+        ALTER TABLE {table}_new RENAME TO {table};
+        CREATE INDEX {table}_done_date ON {table}(is_done, date);
+        CREATE INDEX {table}_title ON {table}(title);''',
+        # 3: full text search index over title and info, kept in sync with triggers
+        '''CREATE VIRTUAL TABLE {table}_fts USING fts5(title, info, content='{table}', content_rowid='_ID');
+        CREATE TRIGGER {table}_fts_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO {table}_fts(rowid, title, info) VALUES (new._ID, new.title, new.info);
+        END;
+        CREATE TRIGGER {table}_fts_delete AFTER DELETE ON {table} BEGIN
+            INSERT INTO {table}_fts({table}_fts, rowid, title, info) VALUES ('delete', old._ID, old.title, old.info);
+        END;
+        CREATE TRIGGER {table}_fts_update AFTER UPDATE OF title, info ON {table} BEGIN
+            INSERT INTO {table}_fts({table}_fts, rowid, title, info) VALUES ('delete', old._ID, old.title, old.info);
+            INSERT INTO {table}_fts(rowid, title, info) VALUES (new._ID, new.title, new.info);
+        END;
+        INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild');''',
+        # 4: revision counter bumped by every row change, rows remember the revision they last changed in and
+        # deleted rows leave a tombstone, so other processes can fetch only what changed since the revision they saw
+        '''CREATE TABLE {table}_revision(id INTEGER PRIMARY KEY CHECK (id = 1), rev INTEGER NOT NULL);
+        INSERT INTO {table}_revision(id, rev) VALUES (1, 0);
+        ALTER TABLE {table} ADD COLUMN rev INTEGER NOT NULL DEFAULT 0;
+        CREATE INDEX {table}_rev ON {table}(rev);
+        CREATE TABLE {table}_deleted(_ID INTEGER PRIMARY KEY NOT NULL, rev INTEGER NOT NULL);
+        CREATE INDEX {table}_deleted_rev ON {table}_deleted(rev);
+        CREATE TRIGGER {table}_rev_insert AFTER INSERT ON {table} BEGIN
+            UPDATE {table}_revision SET rev = rev + 1;
+            UPDATE {table} SET rev = (SELECT rev FROM {table}_revision) WHERE _ID = new._ID;
+            DELETE FROM {table}_deleted WHERE _ID = new._ID;
+        END;
+        CREATE TRIGGER {table}_rev_update AFTER UPDATE OF date, title, info, is_done ON {table} BEGIN
+            UPDATE {table}_revision SET rev = rev + 1;
+            UPDATE {table} SET rev = (SELECT rev FROM {table}_revision) WHERE _ID = new._ID;
+        END;
+        CREATE TRIGGER {table}_rev_delete AFTER DELETE ON {table} BEGIN
+            UPDATE {table}_revision SET rev = rev + 1;
+            INSERT OR REPLACE INTO {table}_deleted(_ID, rev) VALUES (old._ID, (SELECT rev FROM {table}_revision));
+        END;''',
+        # 5: indexes for the remaining get_view orders, date without a status filter and title with one
+        '''CREATE INDEX {table}_date ON {table}(date);
+        CREATE INDEX {table}_done_title ON {table}(is_done, title);''',
+        # 6: when entries were marked done, kept by triggers, and the archive old done entries are moved to.
+        # Entries that were already done count as done since the migration
+        '''ALTER TABLE {table} ADD COLUMN done_at INTEGER;
+        UPDATE {table} SET done_at = CAST(strftime('%s', 'now') AS INTEGER) WHERE is_done;
+        CREATE INDEX {table}_done_at ON {table}(done_at) WHERE is_done;
+        CREATE TRIGGER {table}_done_at_insert AFTER INSERT ON {table} WHEN new.is_done BEGIN
+            UPDATE {table} SET done_at = CAST(strftime('%s', 'now') AS INTEGER) WHERE _ID = new._ID;
+        END;
+        CREATE TRIGGER {table}_done_at_update AFTER UPDATE OF is_done ON {table} WHEN new.is_done IS NOT old.is_done BEGIN
+            UPDATE {table} SET done_at = CASE WHEN new.is_done THEN CAST(strftime('%s', 'now') AS INTEGER) END WHERE _ID = new._ID;
+        END;
+        CREATE TABLE {table}Archive(_ID INTEGER PRIMARY KEY NOT NULL, date INTEGER NOT NULL, title TEXT NOT NULL, info TEXT,
+                                    is_done BOOL NOT NULL, done_at INTEGER, archived_at INTEGER NOT NULL);''',
+        # 7: AUTOINCREMENT so the _ID of an archived(or deleted) entry is never given to a new one, archiving the new one
+        # failed on the archives primary key. Archived rows that already clash are moved past every used _ID first.
+        # Rebuilding the table drops its indexes and triggers, they are created again as they were
+        '''UPDATE {table}Archive SET _ID = _ID + (SELECT MAX(IFNULL((SELECT MAX(_ID) FROM {table}), 0), IFNULL((SELECT MAX(_ID) FROM {table}Archive), 0)))
+            WHERE _ID IN (SELECT _ID FROM {table});
+        CREATE TABLE {table}_new(_ID INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL, date INTEGER NOT NULL, title TEXT NOT NULL, info TEXT,
+                                 is_done BOOL NOT NULL, rev INTEGER NOT NULL DEFAULT 0, done_at INTEGER);
+        INSERT INTO {table}_new(_ID, date, title, info, is_done, rev, done_at) SELECT _ID, date, title, info, is_done, rev, done_at FROM {table};
+        DROP TABLE {table};
+        ALTER TABLE {table}_new RENAME TO {table};
+        INSERT INTO sqlite_sequence(name, seq) SELECT '{table}', 0 WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = '{table}');
+        UPDATE sqlite_sequence SET seq = MAX(seq, IFNULL((SELECT MAX(_ID) FROM {table}Archive), 0), IFNULL((SELECT MAX(_ID) FROM {table}_deleted), 0))
+            WHERE name = '{table}';
+        CREATE INDEX {table}_done_date ON {table}(is_done, date);
+        CREATE INDEX {table}_title ON {table}(title);
+        CREATE INDEX {table}_rev ON {table}(rev);
+        CREATE INDEX {table}_date ON {table}(date);
+        CREATE INDEX {table}_done_title ON {table}(is_done, title);
+        CREATE INDEX {table}_done_at ON {table}(done_at) WHERE is_done;
+        CREATE TRIGGER {table}_fts_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO {table}_fts(rowid, title, info) VALUES (new._ID, new.title, new.info);
+        END;
+        CREATE TRIGGER {table}_fts_delete AFTER DELETE ON {table} BEGIN
+            INSERT INTO {table}_fts({table}_fts, rowid, title, info) VALUES ('delete', old._ID, old.title, old.info);
+        END;
+        CREATE TRIGGER {table}_fts_update AFTER UPDATE OF title, info ON {table} BEGIN
+            INSERT INTO {table}_fts({table}_fts, rowid, title, info) VALUES ('delete', old._ID, old.title, old.info);
+            INSERT INTO {table}_fts(rowid, title, info) VALUES (new._ID, new.title, new.info);
+        END;
+        CREATE TRIGGER {table}_rev_insert AFTER INSERT ON {table} BEGIN
+            UPDATE {table}_revision SET rev = rev + 1;
+            UPDATE {table} SET rev = (SELECT rev FROM {table}_revision) WHERE _ID = new._ID;
+            DELETE FROM {table}_deleted WHERE _ID = new._ID;
+        END;
+        CREATE TRIGGER {table}_rev_update AFTER UPDATE OF date, title, info, is_done ON {table} BEGIN
+            UPDATE {table}_revision SET rev = rev + 1;
+            UPDATE {table} SET rev = (SELECT rev FROM {table}_revision) WHERE _ID = new._ID;
+        END;
+        CREATE TRIGGER {table}_rev_delete AFTER DELETE ON {table} BEGIN
+            UPDATE {table}_revision SET rev = rev + 1;
+            INSERT OR REPLACE INTO {table}_deleted(_ID, rev) VALUES (old._ID, (SELECT rev FROM {table}_revision));
+        END;
+        CREATE TRIGGER {table}_done_at_insert AFTER INSERT ON {table} WHEN new.is_done BEGIN
+            UPDATE {table} SET done_at = CAST(strftime('%s', 'now') AS INTEGER) WHERE _ID = new._ID;
+        END;
+        CREATE TRIGGER {table}_done_at_update AFTER UPDATE OF is_done ON {table} WHEN new.is_done IS NOT old.is_done BEGIN
+            UPDATE {table} SET done_at = CASE WHEN new.is_done THEN CAST(strftime('%s', 'now') AS INTEGER) END WHERE _ID = new._ID;
+        END;''',
+        # 8: a done_at given on insert(restored from the archive, undone delete) is kept, only done entries without one get the insert time
+        '''DROP TRIGGER {table}_done_at_insert;
+        CREATE TRIGGER {table}_done_at_insert AFTER INSERT ON {table} WHEN new.is_done AND new.done_at IS NULL BEGIN
+            UPDATE {table} SET done_at = CAST(strftime('%s', 'now') AS INTEGER) WHERE _ID = new._ID;
+        END;''',
+        # 9: tombstones get pruned, pruned_rev is the newest revision whose tombstones are gone.
+        # Changes since an older revision cant be listed any more, see get_changes_since
+        '''ALTER TABLE {table}_revision ADD COLUMN pruned_rev INTEGER NOT NULL DEFAULT 0;''',
+        )
+    CONNECTION_TIMEOUT:float = 0.5 # 0.5s timout since it's local DB
+    LOCK_RETRIES:int = 2 # extra attempts when another process still holds the lock after the timeout
+    STATEMENT_CACHE_SIZE:int = 256 # how many prepared statements sqlite3 keeps per connection
+    CONNECTION_PRAGMAS: MappingProxyType = MappingProxyType({
+        "journal_mode": "WAL", # readers dont block the writer and commits are cheaper
+        "synchronous": "NORMAL", # safe with WAL, skips an fsync per commit
+        "cache_size": -8000, # negative value is in KiB, so ~8MB page cache
+        "temp_store": "MEMORY",
+        })
+    
+    __local: threading.local = threading.local() # holds the connection for the current thread
+    
+    @classmethod
+    def open_connection(cls) -> sqlite3.Connection:
+        '''
+        Opens(or returns the already open) connection for the current thread
+        
+        Returns:
+            sqlite3.Connection
+        '''
+        conn: sqlite3.Connection = getattr(cls.__local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(cls.DATABASE_PATH, 
+                                   timeout=cls.CONNECTION_TIMEOUT, 
+                                   cached_statements=cls.STATEMENT_CACHE_SIZE)
+            for pragma, value in cls.CONNECTION_PRAGMAS.items():
+                conn.execute(f"PRAGMA {pragma}={value};")
+            cls.__local.conn = conn
+        return conn
+    
+    @classmethod
+    def close_connection(cls):
+        '''
+        Closes the connection for the current thread, safe to call if nothing is open
+        '''
+        conn: sqlite3.Connection = getattr(cls.__local, "conn", None)
+        if conn is not None:
+            cls.__local.conn = None
+            conn.close()
+
+    @classmethod
+    def execure_sql_querry(cls, sql_statment:str, write_querry:bool = False, values:tuple = ()) -> tuple[bool, list]: # list | bool Python 3.10+ Hinting
+        '''
+        Executes the querrrie on the current threads connection
+        
+        Args:
+           sql_statment(str): SQL Querrie
+           write_querry(bool): set true if its a write function
+           values(tuple): write function might have values that need to be passed it
+           
+        Returns:
+            tuple(bool, list)
+                bool: was the querrie sucsessful?
+                list: get(non-write) querries return a list of rows, write querries return [lastrowid]
+        '''
+        successful: bool = False 
+        return_list: list = []
+        metrics: ToDoMetrics.Metrics = ToDoMetrics.ACTIVE
+        start: float = time.perf_counter() if metrics is not None else 0.0
+        commit_ms: float = -1.0
+        for attempt in range(cls.LOCK_RETRIES + 1):
+            try:
+                conn: sqlite3.Connection = cls.open_connection()
+                with conn:# commits on success and rolls back on error, connection stays open
+                    cursor = conn.execute(sql_statment, values)
+                    if write_querry:
+                        return_list = [cursor.lastrowid] # lets callers know the _ID of an inserted row without re-reading the table
+                    else:
+                        return_list = cursor.fetchall() # fetchall is only needed if we are retiving data, write_querry == False
+                    executed: float = time.perf_counter()
+                if write_querry and metrics is not None:
+                    commit_ms = (time.perf_counter() - executed) * 1000
+                successful = True # No error so SQL querry was successful 
+                break
+            except Exception as ex:
+                if attempt < cls.LOCK_RETRIES and cls.__is_locked(ex):
+                    if metrics is not None:
+                        metrics.count("db.lock_retries")
+                    continue # the busy timeout already waited, so trying again right away
+                print(ex)
+                break
+        if metrics is not None:
+            metrics.observe_statement(sql_statment, (time.perf_counter() - start) * 1000, 
+                                      len(return_list) if not write_querry else 1, commit_ms, successful)
+        return successful, return_list
+    
+    @classmethod
+    def __is_locked(cls, ex: Exception) -> bool:
+        '''
+        Is the error another connection holding the database lock
+        '''
+        if not isinstance(ex, sqlite3.OperationalError):
+            return False
+        conn: sqlite3.Connection = getattr(cls.__local, "conn", None)
+        if conn is not None and conn.in_transaction:
+            conn.rollback() # a failed commit leaves the transaction open
+        return "locked" in str(ex) or "busy" in str(ex)
+        
+    @classmethod
+    def execute_many(cls, sql_statment:str, values: Iterable[tuple]) -> tuple[bool, int]:
+        '''
+        Executes a write querrie once for every values tuple inside a single transaction,
+        so a batch costs one commit instead of one per row
+        
+        Args:
+           sql_statment(str): SQL Querrie
+           values(Iterable[tuple]): values for each execution
+           
+        Returns:
+            tuple(bool, int)
+                bool: was the batch sucsessful? On failure nothing from the batch is written
+                int: amount of affected rows
+        '''
+        successful: bool = False
+        row_count: int = 0
+        metrics: ToDoMetrics.Metrics = ToDoMetrics.ACTIVE
+        start: float = time.perf_counter() if metrics is not None else 0.0
+        commit_ms: float = -1.0
+        try:
+            conn: sqlite3.Connection = cls.open_connection()
+            with conn:# single transaction, rolled back as a whole on error
+                row_count = conn.executemany(sql_statment, values).rowcount
+                executed: float = time.perf_counter()
+            commit_ms = (time.perf_counter() - executed) * 1000
+            successful = True
+        except Exception as ex:
+            # not retried, values can be a generator that is already used up
+            if metrics is not None and cls.__is_locked(ex):
+                metrics.count("db.lock_failures")
+            print(ex)
+        if metrics is not None:
+            metrics.observe_statement(sql_statment, (time.perf_counter() - start) * 1000, row_count, commit_ms, successful)
+        return successful, row_count
+        
+    @classmethod
+    def verify_db(cls, table_name:str = "") -> bool:
+        '''
+        Checks if database and table exists, if not it creates them
+        Args:
+            table_name(str): optional table name, DEFAULT will use static MAIN_TABLE
+        Retruns:
+            bool: connection good?
+            
+        ##DOCTEST###
+        >>> DatabaseManager.verify_db()
+        True
+        '''
+        # if no or empry table name is provided it will use static constant MAIN_TABLE
+        table_name = cls.MAIN_TABLE if table_name == "" else table_name 
+        
+        return cls.migrate_db(table_name)
+    
+    @classmethod
+    def migrate_db(cls, table_name:str) -> bool:
+        '''
+        Brings the database schema up to date by applying every SCHEMA_MIGRATIONS step
+        newer than the databases user_version. Each step runs in its own transaction,
+        so a failed step leaves the database at the previous version without data loss
+        
+        Args:
+            table_name(str): table the migrations apply to
+        Retruns:
+            bool: is the schema up to date
+        '''
+        successful, return_list = cls.execure_sql_querry("PRAGMA user_version;")
+        if not successful:
+            return False
+        
+        conn: sqlite3.Connection = cls.open_connection()
+        for version in range(return_list[0][0] + 1, len(cls.SCHEMA_MIGRATIONS) + 1):
+            script: str = cls.SCHEMA_MIGRATIONS[version - 1].format(table=table_name)
+            try:
+                # user_version is part of the transaction, it only moves if the whole step worked
+                conn.executescript(f"BEGIN; {script} PRAGMA user_version={version}; COMMIT;")
+            except Exception as ex:
+                print(ex)
+                if conn.in_transaction:
+                    conn.rollback()
+                return False
+        return True
+    
+    @classmethod
+    def add_entry(cls, val: MappingProxyType) -> tuple[bool, int]:
+        '''
+        Allows to add new entry to local db
+        
+        Args:
+           val(MappingProxyType): immutable dic of keys(columbs in db) and values
+           
+        Returns:
+            tuple(bool, int)
+                bool: entry sucsesfull
+                int: _ID of the new entry, 0 if it failed
+        '''
+
+        #generates a INSERT querry with dic keys as keys for db columbs and values as ?. This allows me to pass values in @call and
+        #has a built int querry sanitization to prevent SQL injections
+        sql_querry:str = f"INSERT INTO {cls.MAIN_TABLE}({','.join(val.keys())}) VALUES({','.join('?'*len(val))})" 
+        successful, return_list = cls.execure_sql_querry(sql_querry, True, tuple(val.values()))
+        return successful, return_list[0] if successful else 0
+    
+    @classmethod
+    def delete_entry(cls, id:int) -> bool:
+        '''
+        Allows to remove entry to local db
+        
+        Args:
+           id(int): local database id
+           
+        Returns:
+            bool: delete sucsesfull
+        '''
+        
+        sql_querry:str = f"DELETE FROM {cls.MAIN_TABLE} WHERE _ID=?;" # bound values keep the SQL text constant so the cached statement is reused
+        return cls.execure_sql_querry(sql_querry, True, (id,))[0]
+    
+    @classmethod
+    def add_entries(cls, vals: Iterable[MappingProxyType], return_new: bool = True) -> tuple[bool, list]:
+        '''
+        Adds many entries in one transaction, vals is consumed lazily so it can be a generator
+        
+        Args:
+           vals(Iterable[MappingProxyType]): immutable dics of keys(columbs in db) and values, all with the same keys
+           return_new(bool): OPTIONAL read the new rows back, DEFAULT True
+           
+        Returns:
+            tuple(bool, list)
+                bool: entries sucsesfull
+                list: rows added to the table since the batch started(the new entries), empty if return_new is False
+        '''
+        vals_iter = iter(vals)
+        first: MappingProxyType = next(vals_iter, None)
+        if first is None:
+            return True, [] # nothing to add
+        
+        successful, return_list = cls.execure_sql_querry(f"SELECT IFNULL(MAX(_ID), 0) FROM {cls.MAIN_TABLE};")
+        if not successful:
+            return False, []
+        last_id: int = return_list[0][0]
+        
+        keys: tuple = tuple(first.keys())
+        sql_querry:str = f"INSERT INTO {cls.MAIN_TABLE}({','.join(keys)}) VALUES({','.join('?'*len(keys))})" 
+        values = (tuple(val[key] for key in keys) for val in itertools.chain((first,), vals_iter))
+        if not cls.execute_many(sql_querry, values)[0]:
+            return False, []
+        if not return_new:
+            return True, []
+        return cls.get_entries_after(last_id, -1) # LIMIT -1 means no limit
+    
+    @classmethod
+    def delete_entries(cls, ids: Iterable[int]) -> bool:
+        '''
+        Removes many entries in one transaction
+        
+        Args:
+           ids(Iterable[int]): local database ids
+           
+        Returns:
+            bool: delete sucsesfull
+        '''
+        sql_querry:str = f"DELETE FROM {cls.MAIN_TABLE} WHERE _ID=?;"
+        return cls.execute_many(sql_querry, ((id,) for id in ids))[0]
+
+    @classmethod
+    def reinsert_entries(cls, rows: Iterable[tuple]) -> tuple[bool, list]:
+        '''
+        Puts deleted entries back(undo of a delete). They keep their _ID unless a new entry took it meanwhile, then they get a new one
+
+        Args:
+            rows(Iterable[tuple]): rows in ENTRY_COLUMNS order plus done_at, as they were before the delete
+
+        Returns:
+            tuple(bool, list)
+                bool: was the insert sucsesfull
+                list: _ID of every row in the same order, changed ones are new
+        '''
+        new_ids: list[int] = []
+        try:
+            conn: sqlite3.Connection = cls.open_connection()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE;") # nothing can take an _ID between checking and inserting
+                for id, date, title, info, is_done, done_at in rows:
+                    taken: bool = conn.execute(f"SELECT 1 FROM {cls.MAIN_TABLE} WHERE _ID = ?;", (id,)).fetchone() is not None
+                    new_ids.append(conn.execute(f"INSERT INTO {cls.MAIN_TABLE}({cls.ENTRY_COLUMNS}, done_at) VALUES(?,?,?,?,?,?);",
+                                                (None if taken else id, date, title, info, is_done, done_at if is_done else None)).lastrowid)
+        except Exception as ex:
+            print(ex)
+            return False, []
+        return True, new_ids
+
+    @classmethod
+    def set_done_status(cls, ids: Iterable[int], status: bool = True) -> bool:
+        '''
+        Changes the complete status of many entries in one transaction
+        
+        Args:
+            ids(Iterable[int]): local database entry(row) ids
+            statsus(bool): new status for all the entries
+            
+        Returns:
+            bool: update sucsesfull
+        '''
+        sql_querry:str = f"UPDATE {cls.MAIN_TABLE} SET is_done=? WHERE _ID=?;"
+        return cls.execute_many(sql_querry, ((status, id) for id in ids))[0]
+    
+    @classmethod
+    def purge_done(cls) -> bool:
+        '''
+        Removes every completed entry
+        
+        Returns:
+            bool: delete sucsesfull
+        '''
+        sql_querry:str = f"DELETE FROM {cls.MAIN_TABLE} WHERE is_done;"
+        return cls.execure_sql_querry(sql_querry, True)[0]
+    
+    @classmethod
+    def archive_done(cls, older_than: int, batch_size: int = 500, progress: Callable = None) -> tuple[bool, list]:
+        '''
+        Moves entries that have been done for longer than older_than seconds to the archive table,
+        batch_size entries per transaction so other connections only wait for one batch at a time
+        
+        Args:
+            older_than(int): seconds since an entry was marked done
+            batch_size(int): OPTIONAL entries moved per transaction
+            progress(Callable): OPTIONAL called with the amount moved so far after every batch
+        
+        Returns:
+            tuple(bool, list)
+                bool: were all the batches moved, the ones before a failure stay moved
+                list: _IDs of the moved entries
+        '''
+        archive: str = f"{cls.MAIN_TABLE}Archive"
+        now: int = int(datetime.now().timestamp())
+        moved: list[int] = []
+        try:
+            conn: sqlite3.Connection = cls.open_connection()
+            while True:
+                with conn:
+                    conn.execute("BEGIN IMMEDIATE;") # write lock before selecting, so the batch cant change before it moves
+                    ids: list[int] = [row[0] for row in conn.execute(
+                        f"SELECT _ID FROM {cls.MAIN_TABLE} WHERE is_done AND done_at < ? ORDER BY done_at LIMIT ?;",
+                        (now - older_than, batch_size))]
+                    if not ids:
+                        break
+                    batch: str = json.dumps(ids)
+                    conn.execute(f'''INSERT INTO {archive}(_ID, date, title, info, is_done, done_at, archived_at)
+                                    SELECT _ID, date, title, info, is_done, done_at, ? FROM {cls.MAIN_TABLE}
+                                    WHERE _ID IN (SELECT value FROM json_each(?));''', (now, batch))
+                    conn.execute(f"DELETE FROM {cls.MAIN_TABLE} WHERE _ID IN (SELECT value FROM json_each(?));", (batch,))
+                moved.extend(ids)
+                if progress is not None:
+                    progress(len(moved))
+        except Exception as ex:
+            print(ex)
+            return False, moved
+        cls.prune_tombstones() # every moved entry left one, a failed prune is just tried again next time
+        return True, moved
+    
+    @classmethod
+    def get_archived(cls, after_id: int = 0, limit: int = 100) -> tuple[bool, list]:
+        '''
+        Gets archived entries, for browsing the archive a page at a time
+        
+        Args:
+            after_id(int): OPTIONAL only entries with a bigger _ID
+            limit(int): OPTIONAL max amount of rows
+        
+        Returns:
+            tuple(bool, list)
+                bool: was the get sucsesfull
+                list: list of rows ordered by _ID, the same columns as the entry querries
+        '''
+        sql_querry:str = f"SELECT {cls.LIST_COLUMNS} FROM {cls.MAIN_TABLE}Archive WHERE _ID > ? ORDER BY _ID LIMIT ?;"
+        return cls.execure_sql_querry(sql_querry, values=(after_id, limit))
+    
+    @classmethod
+    def restore_archived(cls, ids: Iterable[int]) -> tuple[bool, list]:
+        '''
+        Moves archived entries back. They keep their _ID unless a new entry took it meanwhile, then they get a new one
+        
+        Args:
+            ids(Iterable[int]): _IDs in the archive
+        
+        Returns:
+            tuple(bool, list)
+                bool: was the restore sucsesfull
+                list: the restored rows as they are in the entries table now
+        '''
+        archive: str = f"{cls.MAIN_TABLE}Archive"
+        try:
+            conn: sqlite3.Connection = cls.open_connection()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE;") # nothing can take an _ID between checking and inserting
+                archived: list[int] = [row[0] for row in conn.execute(
+                    f"SELECT _ID FROM {archive} WHERE _ID IN (SELECT value FROM json_each(?));", 
+                    ("[" + ",".join(str(int(id)) for id in ids) + "]",))]
+                batch: str = json.dumps(archived)
+                taken: list[int] = [row[0] for row in conn.execute(
+                    f"SELECT _ID FROM {cls.MAIN_TABLE} WHERE _ID IN (SELECT value FROM json_each(?));", (batch,))]
+                new_ids: list[int] = []
+                for id in taken:
+                    new_ids.append(conn.execute(f'''INSERT INTO {cls.MAIN_TABLE}(date, title, info, is_done, done_at)
+                                                   SELECT date, title, info, is_done, done_at FROM {archive} WHERE _ID = ?;''', (id,)).lastrowid)
+                conn.execute(f'''INSERT INTO {cls.MAIN_TABLE}(_ID, date, title, info, is_done, done_at)
+                                SELECT _ID, date, title, info, is_done, done_at FROM {archive}
+                                WHERE _ID IN (SELECT value FROM json_each(?)) AND _ID NOT IN (SELECT value FROM json_each(?));''',
+                             (batch, json.dumps(taken)))
+                conn.execute(f"DELETE FROM {archive} WHERE _ID IN (SELECT value FROM json_each(?));", (batch,))
+        except Exception as ex:
+            print(ex)
+            return False, []
+        return cls.get_entries_by_id([id for id in archived if id not in taken] + new_ids)
+    
+    @classmethod
+    def vacuum(cls, full: bool = False) -> bool:
+        '''
+        Gives the space freed by archiving back to the file system. The first call(or full) rebuilds the
+        whole file with VACUUM and switches it to incremental auto vacuum, later calls only release the free pages
+        
+        Args:
+            full(bool): OPTIONAL always run a full VACUUM, it also defragments but rewrites the whole file
+        
+        Returns:
+            bool: was the vacuum sucsesfull
+        '''
+        if not cls.prune_tombstones():
+            return False
+        successful, return_list = cls.execure_sql_querry("PRAGMA auto_vacuum;")
+        if not successful:
+            return False
+        try:
+            conn: sqlite3.Connection = cls.open_connection()
+            if full or return_list[0][0] != 2: # 2 = INCREMENTAL
+                conn.execute("PRAGMA auto_vacuum=INCREMENTAL;") # only takes effect through a VACUUM
+                conn.execute("VACUUM;")
+            else:
+                conn.execute("PRAGMA incremental_vacuum;").fetchall() # frees one page per step, fetchall runs all of them
+        except Exception as ex:
+            print(ex)
+            return False
+        return True
+    
+    @classmethod
+    def prune_tombstones(cls, keep: int = None) -> bool:
+        '''
+        Drops the tombstones of deletes older than the last keep revisions, the table would grow with every delete
+        and archived entry otherwise. get_changes_since tells readers from before that to reload
+        
+        Args:
+            keep(int): OPTIONAL revisions to keep tombstones for, DEFAULT TOMBSTONE_KEEP
+        
+        Returns:
+            bool: was the prune sucsesfull
+        '''
+        keep = cls.TOMBSTONE_KEEP if keep is None else keep
+        try:
+            conn: sqlite3.Connection = cls.open_connection()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE;")
+                row: tuple = conn.execute(f"SELECT rev - ? FROM {cls.MAIN_TABLE}_revision WHERE rev - ? > pruned_rev;", (keep, keep)).fetchone()
+                if row is not None:# (horizon,), None when nothing new fell out of the kept revisions
+                    conn.execute(f"DELETE FROM {cls.MAIN_TABLE}_deleted WHERE rev <= ?;", row)
+                    conn.execute(f"UPDATE {cls.MAIN_TABLE}_revision SET pruned_rev = ?;", row)
+        except Exception as ex:
+            print(ex)
+            return False
+        return True
+    
+    @classmethod
+    def get_entries(cls) -> tuple[bool, list]:
+        '''
+        Gets all the entires from the local database
+        
+        Returns:
+            tuple(bool, list)
+                bool: was the get sucsesfull
+                list: list of rows
+        '''
+        sql_querry:str = f"SELECT {cls.LIST_COLUMNS} FROM {cls.MAIN_TABLE};"
+        return cls.execure_sql_querry(sql_querry)
+    
+    @classmethod
+    def iter_entries(cls, after_id: int = 0, batch_size: int = 1000) -> Iterator[list]:
+        '''
+        Streams entries in _ID order with fetchmany, so only batch_size rows are in memory at a time.
+        Unlike the other querries errors are raised(sqlite3.Error), a half read stream cant be reported as a bool
+        
+        Args:
+            after_id(int): OPTIONAL only entries with a bigger _ID, lets an interrupted export continue
+            batch_size(int): OPTIONAL rows per batch
+        
+        Returns:
+            Iterator[list]: batches of rows
+        '''
+        sql_querry:str = f"SELECT {cls.ENTRY_COLUMNS} FROM {cls.MAIN_TABLE} WHERE _ID > ? ORDER BY _ID;"
+        cursor: sqlite3.Cursor = cls.open_connection().execute(sql_querry, (after_id,))
+        try:
+            while True:
+                rows: list = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            cursor.close() # ends the read if the caller stops early
+    
+    @classmethod
+    def get_entries_after(cls, after_id: int, limit: int) -> tuple[bool, list]:
+        '''
+        Gets a page of entries using keyset pagination, walks the _ID primary key
+        so the cost does not grow with how deep into the table the page is
+        
+        Args:
+            after_id(int): only entries with a bigger _ID are returned, 0 for the first page
+            limit(int): max amount of rows to return
+        
+        Returns:
+            tuple(bool, list)
+                bool: was the get sucsesfull
+                list: list of rows ordered by _ID
+        '''
+        sql_querry:str = f"SELECT {cls.LIST_COLUMNS} FROM {cls.MAIN_TABLE} WHERE _ID > ? ORDER BY _ID LIMIT ?;"
+        return cls.execure_sql_querry(sql_querry, values=(after_id, limit))
+    
+    @classmethod
+    def get_entries_before(cls, before_id: int, limit: int) -> tuple[bool, list]:
+        '''
+        Gets the page of entries right before before_id, the reverse of get_entries_after
+        
+        Args:
+            before_id(int): only entries with a smaller _ID are returned
+            limit(int): max amount of rows to return
+        
+        Returns:
+            tuple(bool, list)
+                bool: was the get sucsesfull
+                list: list of rows ordered by _ID descending(closest to before_id first)
+        '''
+        sql_querry:str = f"SELECT {cls.LIST_COLUMNS} FROM {cls.MAIN_TABLE} WHERE _ID < ? ORDER BY _ID DESC LIMIT ?;"
+        return cls.execure_sql_querry(sql_querry, values=(before_id, limit))
+    
+    @classmethod
+    def get_view(cls, order: str = "id", is_done: bool = None, date_from: int = None, date_to: int = None,
+                 cursor: Iterable = None, descending: bool = False, inclusive: bool = False, 
+                 limit: int = -1, offset: int = 0) -> tuple[bool, list]:
+        '''
+        Gets a filtered and sorted view of the entries, each filter/order combination has an index behind it
+        
+        Args:
+            order(str): OPTIONAL a VIEW_ORDERS key
+            is_done(bool): OPTIONAL only done(True) or open(False) entries, DEFAULT None = both
+            date_from(int): OPTIONAL only entries created at or after this unix epoch time
+            date_to(int): OPTIONAL only entries created before this unix epoch time
+            cursor(Iterable): OPTIONAL keyset cursor, values of the order columns of the row to continue from.
+                Only rows sorting after it(before it when descending) are returned
+            descending(bool): OPTIONAL reverse the order
+            inclusive(bool): OPTIONAL include the cursor row itself
+            limit(int): OPTIONAL max amount of rows, DEFAULT -1 = no limit
+            offset(int): OPTIONAL rows to skip, prefer a cursor for paging since skipped rows are still read
+        
+        Returns:
+            tuple(bool, list)
+                bool: was the get sucsesfull
+                list: list of rows
+        '''
+        columns: tuple[str] = cls.VIEW_ORDERS.get(order)
+        if columns is None:
+            print(f"Unknown view order {order!r}")
+            return False, []
+        # only column names from VIEW_ORDERS go into the SQL text, every value is bound
+        clauses: list[str] = []
+        values: list = []
+        if is_done is not None:
+            clauses.append("is_done = ?")
+            values.append(bool(is_done))
+        if date_from is not None:
+            clauses.append("date >= ?")
+            values.append(date_from)
+        if date_to is not None:
+            clauses.append("date < ?")
+            values.append(date_to)
+        if cursor is not None:
+            cursor = tuple(cursor)
+            if len(cursor) != len(columns):
+                print(f"Cursor for {order!r} needs {len(columns)} values")
+                return False, []
+            operator: str = ("<" if descending else ">") + ("=" if inclusive else "")
+            clauses.append(f"({', '.join(columns)}) {operator} ({', '.join('?' * len(columns))})")
+            values.extend(cursor)
+        direction: str = " DESC" if descending else ""
+        sql_querry: str = (f"SELECT {cls.LIST_COLUMNS} FROM {cls.MAIN_TABLE}"
+                           + (f" WHERE {' AND '.join(clauses)}" if clauses else "")
+                           + f" ORDER BY {', '.join(column + direction for column in columns)} LIMIT ? OFFSET ?;")
+        return cls.execure_sql_querry(sql_querry, values=(*values, limit, offset))
+    
+    @classmethod
+    def get_entries_by_id(cls, ids: Iterable[int]) -> tuple[bool, list]:
+        '''
+        Gets specific entries
+        
+        Args:
+            ids(Iterable[int]): local database ids
+        
+        Returns:
+            tuple(bool, list)
+                bool: was the get sucsesfull
+                list: list of rows ordered by _ID, ids that dont exist are left out
+        '''
+        # ids passed as one JSON array so any amount fits in a single bound value
+        sql_querry:str = f"SELECT {cls.LIST_COLUMNS} FROM {cls.MAIN_TABLE} WHERE _ID IN (SELECT value FROM json_each(?)) ORDER BY _ID;"
+        return cls.execure_sql_querry(sql_querry, values=("[" + ",".join(str(int(id)) for id in ids) + "]",))
+    
+    @classmethod
+    def get_info(cls, ids: Iterable[int]) -> tuple[bool, list]:
+        '''
+        Gets the info text the list querries leave out, and when the entry was marked done
+        
+        Args:
+            ids(Iterable[int]): local database ids
+        
+        Returns:
+            tuple(bool, list)
+                bool: was the get sucsesfull
+                list: (_ID, info, done_at) rows, ids that dont exist are left out
+        '''
+        sql_querry:str = f"SELECT _ID, info, done_at FROM {cls.MAIN_TABLE} WHERE _ID IN (SELECT value FROM json_each(?));"
+        return cls.execure_sql_querry(sql_querry, values=("[" + ",".join(str(int(id)) for id in ids) + "]",))
+    
+    @classmethod
+    def get_done_ids(cls) -> tuple[bool, list]:
+        '''
+        Gets the ids of every completed entry
+        
+        Returns:
+            tuple(bool, list)
+                bool: was the get sucsesfull
+                list: list of _IDs
+        '''
+        sql_querry:str = f"SELECT _ID FROM {cls.MAIN_TABLE} WHERE is_done;"
+        successful, return_list = cls.execure_sql_querry(sql_querry)
+        return successful, [row[0] for row in return_list]
+    
+    @classmethod
+    def get_data_version(cls) -> int:
+        '''
+        PRAGMA data_version of this threads connection, it changes when another connection commits.
+        Doesnt touch the table so its cheap enough to check often
+        
+        Returns:
+            int: data version, -1 if it couldnt be read
+        '''
+        successful, return_list = cls.execure_sql_querry("PRAGMA data_version;")
+        return return_list[0][0] if successful else -1
+    
+    @classmethod
+    def get_revision(cls) -> tuple[bool, int]:
+        '''
+        Returns:
+            tuple(bool, int)
+                bool: was the get sucsesfull
+                int: revision of the last change made to the table
+        '''
+        successful, return_list = cls.execure_sql_querry(f"SELECT rev FROM {cls.MAIN_TABLE}_revision;")
+        return successful, return_list[0][0] if successful else 0
+    
+    @classmethod
+    def get_changes_since(cls, rev: int) -> tuple[bool, int, list, list]:
+        '''
+        Gets what changed after a revision, from any connection
+        
+        Args:
+            rev(int): last revision already seen
+        
+        Returns:
+            tuple(bool, int, list, list)
+                bool: was the get sucsesfull
+                int: current revision, pass it to the next call
+                list: rows added or changed since rev, None if rev is older than the kept tombstones(reload everything)
+                list: _IDs deleted since rev, None with the rows
+        '''
+        # revision first, a change commited in between is fetched again next time instead of missed
+        successful, current_rev = cls.get_revision()
+        if not successful:
+            return False, rev, [], []
+        successful, rows = cls.execure_sql_querry(f"SELECT {cls.LIST_COLUMNS} FROM {cls.MAIN_TABLE} WHERE rev > ? ORDER BY _ID;", values=(rev,))
+        if not successful:
+            return False, rev, [], []
+        successful, deleted = cls.execure_sql_querry(f"SELECT _ID FROM {cls.MAIN_TABLE}_deleted WHERE rev > ?;", values=(rev,))
+        if not successful:
+            return False, rev, [], []
+        # horizon last, a prune between the querries took tombstones the list above is missing
+        successful, horizon = cls.execure_sql_querry(f"SELECT pruned_rev FROM {cls.MAIN_TABLE}_revision;")
+        if not successful:
+            return False, rev, [], []
+        if rev < horizon[0][0]:
+            return True, current_rev, None, None
+        return True, current_rev, rows, [row[0] for row in deleted]
+    
+    @classmethod
+    def search(cls, query: str, limit: int = 100) -> tuple[bool, list]:
+        '''
+        Full text search over title and info, every word in the query is matched as a prefix
+        
+        Args:
+            query(str): search text as the user typed it
+            limit(int): OPTIONAL max amount of rows to return
+        
+        Returns:
+            tuple(bool, list)
+                bool: was the search sucsesfull
+                list: list of rows, best match first
+        '''
+        # quoting every word so FTS5 syntax(AND, *, quotes..) in user input is searched for instead of parsed
+        match: str = " ".join(f'"{word}"*' for word in re.findall(r"\w+", query))
+        if match == "":
+            return True, []
+        columns: str = ", ".join(column if column == "NULL" else f"{cls.MAIN_TABLE}.{column}" 
+                                 for column in cls.LIST_COLUMNS.split(", ")) # fts has title and info too
+        sql_querry:str = f'''SELECT {columns} FROM {cls.MAIN_TABLE}_fts 
+                            JOIN {cls.MAIN_TABLE} ON {cls.MAIN_TABLE}._ID = {cls.MAIN_TABLE}_fts.rowid
+                            WHERE {cls.MAIN_TABLE}_fts MATCH ? ORDER BY {cls.MAIN_TABLE}_fts.rank LIMIT ?;'''
+        return cls.execure_sql_querry(sql_querry, values=(match, limit))
+    
+    @classmethod
+    def change_done_status(cls, id: int, status: bool = True) -> bool:
+        '''
+        Changes the complete status of an entry
+           
+        Args:
+            id(int): local database entry(row) id
+            statsus(bool): new status of the entry
+        '''
+        sql_querry:str = f"UPDATE {cls.MAIN_TABLE} SET is_done=? WHERE _ID=?;"
+        return cls.execure_sql_querry(sql_querry, True, (status, id))[0]
+  
+class DatabaseWorker:
+    '''
+    Runs database jobs one at a time, in submit order, on a background thread so the GUI thread never waits on I/O.
+    The thread has its own DatabaseManager connection.
+    Finished jobs are handed back on the thread that owns the worker(the GUI thread) through the scheduler,
+    polling only while there are jobs pending so an idle worker costs nothing
+    '''
+    POLL_MS: int = 10 # how often finished jobs are checked for while jobs are pending
+    
+    def __init__(self, scheduler: Callable):
+        '''
+        Args:
+            scheduler(Callable): scheduler(ms, func) that calls func on the GUI thread after ms, like Tk.after
+        '''
+        self.__scheduler = scheduler
+        self.__jobs: queue.Queue = queue.Queue() # (job, future, on_done, failed) waiting for the worker thread
+        self.__finished: queue.Queue = queue.Queue() # (future, on_done, failed) waiting for the GUI thread
+        self.__pending: int = 0 # submitted but not handed back yet, only used on the GUI thread
+        self.__thread: threading.Thread = threading.Thread(target=self.__run, name="DatabaseWorker", daemon=True)
+        self.__thread.start()
+    
+    def submit(self, job: Callable, on_done: Callable = None, failed = None) -> "Future":
+        '''
+        Queues a job for the worker thread
+        
+        Args:
+            job(Callable): function without arguments, runs on the worker thread
+            on_done(Callable): OPTIONAL called with the jobs return value on the GUI thread
+            failed: OPTIONAL what on_done gets instead if the job raised an exception,
+                so whoever waits for the job still finds out it is over
+        
+        Returns:
+            Future: resolved on the worker thread once the job ran
+        '''
+        from concurrent.futures import Future # imported here, it pulls in logging which the command line never needs
+        future: Future = Future()
+        self.__jobs.put((job, future, on_done, failed))
+        self.__pending += 1
+        if self.__pending == 1:# first pending job, starting to poll
+            self.__scheduler(DatabaseWorker.POLL_MS, self.__poll)
+        return future
+    
+    def drain(self, wait: bool = False):
+        '''
+        Hands finished jobs back to their on_done callbacks, on the calling(GUI) thread
+        
+        Args:
+            wait(bool): OPTIONAL block until every pending job finished
+        '''
+        while self.__pending > 0:
+            try:
+                future, on_done, failed = self.__finished.get(block=wait)
+            except queue.Empty:
+                return
+            self.__pending -= 1
+            if on_done is not None:
+                on_done(future.result() if future.exception() is None else failed)
+    
+    def close(self):
+        '''
+        Lets the queued jobs finish, hands back their results and stops the thread.
+        The thread closes its database connection before exiting
+        '''
+        self.drain(wait=True)
+        self.__jobs.put(None)
+        self.__thread.join()
+    
+    def __poll(self):
+        self.drain()
+        if self.__pending > 0:
+            self.__scheduler(DatabaseWorker.POLL_MS, self.__poll)
+    
+    def __run(self):
+        while True:
+            item = self.__jobs.get()
+            if item is None:# close() was called
+                break
+            job, future, on_done, failed = item
+            try:
+                future.set_result(job())
+            except Exception as ex:
+                print(ex)
+                future.set_exception(ex)
+            self.__finished.put((future, on_done, failed))
+        DatabaseManager.close_connection()
+  
+class ToDoLogic():
+    # Change types passed to list_change_callback, together with the affected indices
+    CHANGE_RELOAD: str = "reload" # whole list changed, indices are empty
+    CHANGE_INSERT: str = "insert" # indices are positions of new entries
+    CHANGE_DELETE: str = "delete" # indices are positions the entries were removed from
+    CHANGE_UPDATE: str = "update" # indices are positions of entries that changed in place
+    SEARCH_LIMIT: int = 200 # max search results shown
+    TITLE_MAX_LENGTH: int = 20 # longer titles dont fit in the listbox
+    CHANGE_POLL_MS: int = 100 # how often changes pushed by a remote database are applied
+    JOURNAL_SIZE: int = 100 # how many operations can be undone
+    COALESCE_MS: int = 500 # status changes and deletes are held this long so rapid edits end up as one write
+    INFO_CACHE_SIZE: int = 128 # info texts kept, the list itself never holds them
+    # View orders, see set_view
+    ORDER_ADDED: str = "id"
+    ORDER_DATE: str = "date"
+    ORDER_TITLE: str = "title"
+    DEFAULT_VIEW: MappingProxyType = MappingProxyType({"order": ORDER_ADDED, "is_done": None, "date_from": None, "date_to": None})
+    # Operations in the undo journal
+    JOURNAL_STATUS: str = "status"
+    JOURNAL_DELETE: str = "delete"
+    
+    def __init__(self, list_change_callback: Callable, error_callback: Callable, resync_every: int = 0,
+                 page_size: int = 0, buffer_pages: int = 3, scheduler: Callable = None, database = DatabaseManager,
+                 watch_ms: int = 0):
+        '''
+        Args:
+            list_change_callback(Callable): callback for GUI to update its display list, 
+                called with a change type(CHANGE_*) and a tuple of affected indices
+            error_callback(Callable): callback for GUI to display an error message
+            resync_every(int): OPTIONAL verify the cached list against the database every N changes, DEFAULT 0 = never
+            page_size(int): OPTIONAL only keep a window of entries in memory, loaded page_size rows at a time,
+                DEFAULT 0 = load the whole table
+            buffer_pages(int): OPTIONAL max pages kept in the window before the far end gets dropped, min 3
+            scheduler(Callable): OPTIONAL scheduler(ms, func) running func on the GUI thread(like Tk.after).
+                When given database calls run on a DatabaseWorker thread and changes are shown optimistically,
+                then rolled back if the write fails. DEFAULT None = database calls run synchronously
+            database: OPTIONAL anything with the DatabaseManager querry methods, like ToDoServer.RemoteDatabase.
+                If it has set_change_listener its change feed is applied to the list, see apply_pending_changes
+            watch_ms(int): OPTIONAL with a scheduler, check for changes made by other processes every watch_ms,
+                see check_external_changes. DEFAULT 0 = never
+        '''
+        self.__entry_list: list[ToDoEntry] = [] # whole table, or the current window when paging is on
+        self.__page_size: int = page_size
+        self.__buffer_size: int = page_size * max(buffer_pages, 3) # 3 pages so loading one never drops the visible one
+        self.__has_more_before: bool = False # are there entries before the window
+        self.__has_more_after: bool = False # are there entries after the window
+        self.__loading_page: bool = False # a page load is in flight, dont request another one
+        self.__window_generation: int = 0 # bumped when the window is fetched anew, page loads started before it are dropped
+        self.__search_query: str = "" # when set the list shows search results instead of the table
+        self.__view: MappingProxyType = ToDoLogic.DEFAULT_VIEW # DatabaseManager.get_view arguments of the shown view
+        self.__list_change_callback = list_change_callback
+        self.__error_callback = error_callback # method callback that displays an error box with a custom message
+        self.__resync_every: int = resync_every
+        self.__changes_since_sync: int = 0
+        self.__write_generation: int = 0 # bumped on every write, reads started before a write get redone
+        self.__worker: DatabaseWorker = DatabaseWorker(scheduler) if scheduler is not None else None
+        self.__scheduler: Callable = scheduler
+        self.__database = database
+        self.__pending_writes: int = 0 # writes not handed back yet, the change feed waits for them
+        self.__remote_changes: queue.Queue = queue.Queue() # (change, rows or ids) from the databases change feed
+        self.__watch_ms: int = watch_ms
+        self.__data_version: int = -1 # PRAGMA data_version at the last check for other processes changes
+        self.__revision: int = 0 # table revision the list has all changes up to
+        self.__checking: bool = False # a check_external_changes is in flight
+        self.__closed: bool = False # stops the periodic checks
+        self.__undo_stack: list[tuple] = [] # (operation, entries, status) newest last, see undo
+        self.__redo_stack: list[tuple] = []
+        # journaled changes not written yet, keyed by id(entry) like the rollbacks so entries waiting for their _ID work
+        self.__unflushed_status: dict[int, tuple[ToDoEntry, bool]] = {} # entry and its status in the database
+        self.__unflushed_deletes: dict[int, ToDoEntry] = {}
+        self.__unflushed_reinserts: dict[int, ToDoEntry] = {} # undone deletes that were already written
+        self.__deleted_done_at: dict[int, int] = {} # id(entry) -> done_at of written deletes, undo puts it back
+        self.__flush_scheduled: bool = False
+        self.__info_cache: OrderedDict[int, str] = OrderedDict() # _ID -> info, least recently used first
+        if hasattr(database, "set_change_listener"):
+            database.set_change_listener(lambda change, payload: self.__remote_changes.put((change, payload)))
+            if scheduler is not None:
+                scheduler(ToDoLogic.CHANGE_POLL_MS, self.__poll_changes)
+        
+        def open_db() -> bool:
+            self.__database.open_connection() # the connection lives as long as the logic, see close()
+            return self.__database.verify_db()
+        
+        def on_opened(successful: bool):
+            if not successful:
+                self.__error_callback("Database Verification Issue")
+        self.__run_db(open_db, on_opened, False)
+        
+        if hasattr(database, "get_data_version"):
+            def read_versions() -> tuple[int, tuple[bool, int]]:
+                return self.__database.get_data_version(), self.__database.get_revision()
+            
+            def on_versions(result: tuple[int, tuple[bool, int]]):
+                self.__data_version, (_, self.__revision) = result
+                if scheduler is not None and watch_ms > 0:
+                    scheduler(watch_ms, self.__poll_external_changes)
+            self.__run_db(read_versions, on_versions, (0, (False, 0))) # the first watch then syncs everything
+           
+          
+    @staticmethod
+    def is_valid_title(title: str) -> bool:
+        '''
+        Checks a title against the length rule every new entry has to follow
+        
+        Args:
+            title(str): entry title
+        
+        Returns:
+            bool: is the title between 1 and TITLE_MAX_LENGTH characters
+        '''
+        return 0 < len(title) <= ToDoLogic.TITLE_MAX_LENGTH
+    
+    def close(self):
+        '''
+        Finishes pending database work and releases the database connection, 
+        call once the logic is no longer used
+        '''
+        self.flush_changes()
+        self.__closed = True
+        if self.__worker is not None:
+            self.__worker.close()
+        else:
+            self.__database.close_connection()
+            
+    def wait_idle(self):
+        '''
+        Blocks until every queued database job is done and its result applied.
+        Does nothing when running synchronously
+        '''
+        if self.__worker is not None:
+            self.__worker.drain(wait=True)
+          
+    def get_entry_display_strings(self) -> tuple[str]:
+        '''
+        get a string list representation of entry_list objects
+        
+        Returns:
+            tuple[str]: each elements represent a ToDoEntry Object
+
+        '''
+        
+        
+        return_list: list[str] = []
+        for entry in self.__entry_list:
+            return_list.append(str(entry))
+        return tuple(return_list)
+    
+    def get_entry_display_string(self, index: int) -> str:
+        '''
+        get the display string of a single entry
+        
+        Args:
+            index(int): index of the entry in listbox
+        
+        Returns:
+            str: display string of the ToDoEntry Object
+        '''
+        return str(self.__entry_list[index])
+    
+    def add_new_entry(self, val: MappingProxyType):
+        '''
+        Allows to add new ToDo entry
+        
+        Args:
+           val(MappingProxyType): immutable dic of keys(columbs in db) and values
+        '''  
+        if self.__has_more_after or self.__search_query or self.__view != ToDoLogic.DEFAULT_VIEW:
+            # window is somewhere in the middle, jumping to the end once its written so the new entry is visible.
+            # When searching the results get refreshed instead, the new entry shows up if it matches.
+            # In other views the new row is read back and goes where it sorts, if it is in the view
+            def on_added(result: tuple[bool, int]):
+                if not result[0]:
+                    self.__error_callback("Failed To Add Entry")
+                    return
+                if self.__search_query:
+                    self.update_entry_list()
+                elif self.__view != ToDoLogic.DEFAULT_VIEW:
+                    self.__run_read(lambda: self.__database.get_entries_by_id([result[1]]), self.__on_rows_read)
+                else:
+                    self.__load_last_page()
+            self.__run_write(lambda: self.__database.add_entry(val), on_added)
+            return
+        
+        # new _ID is always the biggest one so the entry goes to the end of the list.
+        # It gets its real id from the worker before any later job for it runs
+        entry: ToDoEntry = ToDoEntry(0, 
+                                     val["date"], 
+                                     val["title"], 
+                                     val.get("info", ""), 
+                                     bool(val.get("is_done", False)))
+        self.__entry_list.append(entry)
+        self.__notify_change(ToDoLogic.CHANGE_INSERT, (len(self.__entry_list) - 1,))
+        self.__trim_window(True)
+        
+        def add() -> bool:
+            successful, new_id = self.__database.add_entry(val)
+            entry.set_id(new_id)
+            return successful
+        
+        def on_added(successful: bool):
+            if not successful:
+                self.__drop_entries([entry])
+                self.__error_callback("Failed To Add Entry")
+        self.__run_write(add, on_added, False)
+        
+        
+    def remove_entry(self, index: int):
+        '''
+        Removes entry from ToDo based on the index in listbox
+        
+        Args:
+            index(int): index in the list box
+        '''
+        self.remove_entries((index,))
+        
+    def change_entry_status(self, index: int, status: bool):
+        '''
+        Change complete status for ToDo entry
+        
+        Args:
+            index(int): index of the entry in the listbox
+            status(bool): new status for the entry
+        '''
+        self.change_entries_status((index,), status)
+        
+    def add_new_entries(self, vals: Iterable[MappingProxyType]):
+        '''
+        Adds many ToDo entries in one database transaction and one GUI update
+        
+        Args:
+           vals(Iterable[MappingProxyType]): immutable dics of keys(columbs in db) and values
+        '''
+        def on_added(result: tuple[bool, list]):
+            successful, entries = result
+            if not successful:
+                self.__error_callback("Failed To Add Entries")
+                return
+            if not entries:
+                return
+            if self.__search_query:
+                self.update_entry_list()
+                return
+            if self.__view != ToDoLogic.DEFAULT_VIEW:
+                self.__apply_rows(entries)
+                return
+            if self.__has_more_after:
+                self.__load_last_page()
+                return
+            start: int = len(self.__entry_list)
+            self.__entry_list.extend(ToDoEntry(*entry) for entry in entries)
+            self.__notify_change(ToDoLogic.CHANGE_INSERT, tuple(range(start, len(self.__entry_list))))
+            self.__trim_window(True)
+        # ids are only known after the insert so this one is not optimistic
+        self.__run_write(lambda: self.__database.add_entries(vals), on_added)
+    
+    def remove_entries(self, indices: Iterable[int]):
+        '''
+        Removes many entries in one database transaction and one GUI update.
+        The delete is journaled, it can be undone and is only written after COALESCE_MS
+        
+        Args:
+            indices(Iterable[int]): indices in the list box
+        '''
+        indices = tuple(sorted(set(indices)))
+        if not indices:
+            return
+        entries: list[ToDoEntry] = [self.__entry_list[index] for index in indices]
+        for index in reversed(indices):
+            del self.__entry_list[index]
+        self.__notify_change(ToDoLogic.CHANGE_DELETE, indices)
+        self.__journal_delete(entries)
+        self.__record(ToDoLogic.JOURNAL_DELETE, entries, False)
+    
+    def change_entries_status(self, indices: Iterable[int], status: bool):
+        '''
+        Change complete status for many entries in one database transaction and one GUI update.
+        The change is journaled, it can be undone and toggling an entry again within COALESCE_MS writes only once
+        
+        Args:
+            indices(Iterable[int]): indices of the entries in the listbox
+            status(bool): new status for the entries
+        '''
+        indices = tuple(index for index in sorted(set(indices)) if bool(self.__entry_list[index].is_done()) != status)
+        if not indices:
+            return # all of them already have that status
+        entries: list[ToDoEntry] = [self.__entry_list[index] for index in indices]
+        self.__journal_status(entries, status)
+        if self.__view["is_done"] is None or self.__search_query:
+            self.__notify_change(ToDoLogic.CHANGE_UPDATE, indices)
+        else:# the view only shows one status, they dont belong in it any more
+            changed: set[int] = set(map(id, entries))
+            self.__entry_list = [entry for entry in self.__entry_list if id(entry) not in changed]
+            self.__notify_change(ToDoLogic.CHANGE_DELETE, indices)
+        self.__record(ToDoLogic.JOURNAL_STATUS, entries, status)
+    
+    def undo(self) -> bool:
+        '''
+        Reverts the last status change or delete, entries come back where they belong in the current view
+        
+        Returns:
+            bool: was there something to undo
+        '''
+        if not self.__undo_stack:
+            return False
+        operation, entries, status = self.__undo_stack.pop()
+        self.__redo_stack.append((operation, entries, status))
+        if operation == ToDoLogic.JOURNAL_STATUS:
+            self.__journal_status(entries, not status)
+        else:
+            self.__journal_reinsert(entries)
+        self.__show_journal_entries(entries)
+        return True
+    
+    def redo(self) -> bool:
+        '''
+        Does the last undone operation again
+        
+        Returns:
+            bool: was there something to redo
+        '''
+        if not self.__redo_stack:
+            return False
+        operation, entries, status = self.__redo_stack.pop()
+        self.__undo_stack.append((operation, entries, status))
+        if operation == ToDoLogic.JOURNAL_STATUS:
+            self.__journal_status(entries, status)
+            self.__show_journal_entries(entries)
+        else:
+            self.__journal_delete(entries)
+            self.__show_journal_entries(entries, deleted=True)
+        return True
+    
+    def can_undo(self) -> bool:
+        return bool(self.__undo_stack)
+    
+    def can_redo(self) -> bool:
+        return bool(self.__redo_stack)
+    
+    def flush_changes(self):
+        '''
+        Writes the journaled changes now instead of after COALESCE_MS.
+        Runs before every other database job so reads and writes never see the database behind the list
+        '''
+        if not (self.__unflushed_status or self.__unflushed_deletes or self.__unflushed_reinserts):
+            return
+        deletes: list[ToDoEntry] = list(self.__unflushed_deletes.values())
+        reinserts: list[ToDoEntry] = list(self.__unflushed_reinserts.values())
+        # entries toggled back to what the database has need no write at all
+        changes: list[tuple[ToDoEntry, bool]] = [(entry, bool(entry.is_done())) for key, (entry, stored) in self.__unflushed_status.items()
+                                                  if key not in self.__unflushed_deletes and bool(entry.is_done()) != stored]
+        reinsert_done: list[bool] = [bool(entry.is_done()) for entry in reinserts]
+        for entry in deletes:
+            self.__info_cache.pop(entry.get_id(), None)
+        self.__unflushed_status = {}
+        self.__unflushed_deletes = {}
+        self.__unflushed_reinserts = {}
+        if not (deletes or reinserts or changes):
+            return
+        
+        def write() -> bool:
+            # ids are read on the worker, entries that were just added have their real id by then
+            if deletes:
+                missing: dict[int, ToDoEntry] = {entry.get_id(): entry for entry in deletes if entry.get_info() is None or entry.is_done()}
+                if missing:# list rows dont have them, undo needs them to put the row back as it was
+                    successful, infos = self.__database.get_info(list(missing))
+                    if not successful:
+                        return False
+                    for entry_id, info, done_at in infos:
+                        entry: ToDoEntry = missing[entry_id]
+                        entry.set_info(info)
+                        self.__deleted_done_at[id(entry)] = done_at
+                if not self.__database.delete_entries([entry.get_id() for entry in deletes]):
+                    return False
+            if reinserts:# built here, the info of entries deleted by the last flush was read by its job
+                rows: list[tuple] = [(entry.get_id(), entry.get_timestamp(), entry.get_title(), entry.get_info(), is_done,
+                                      self.__deleted_done_at.pop(id(entry), None)) for entry, is_done in zip(reinserts, reinsert_done)]
+                successful, new_ids = self.__database.reinsert_entries(rows)
+                if not successful:
+                    return False
+                for entry, new_id in zip(reinserts, new_ids):
+                    entry.set_id(new_id) # a new entry took the old _ID meanwhile
+            for status in (True, False):
+                ids: list[int] = [entry.get_id() for entry, entry_status in changes if entry_status == status]
+                if ids and not self.__database.set_done_status(ids, status):
+                    return False
+            return True
+        
+        def on_written(successful: bool):
+            if not successful:# list and journal dont match the database any more, starting over from what it has
+                self.__clear_journal()
+                self.__error_callback("Failed To Save Changes")
+                self.update_entry_list()
+        self.__run_write(write, on_written, False)
+        
+    def purge_done_entries(self):
+        '''
+        Removes every completed entry, including the ones outside of the loaded window
+        '''
+        indices: tuple[int] = tuple(index for index, entry in enumerate(self.__entry_list) if entry.is_done())
+        entries: list[ToDoEntry] = [self.__entry_list[index] for index in indices]
+        self.__entry_list = [entry for entry in self.__entry_list if not entry.is_done()]
+        if indices:
+            self.__notify_change(ToDoLogic.CHANGE_DELETE, indices)
+        self.__clear_journal() # purged entries are gone for good
+        self.__info_cache.clear()
+        
+        def on_purged(successful: bool):
+            if not successful:
+                self.__restore_entries(entries)
+                self.__error_callback("Failed To Remove Entries")
+        self.__run_write(self.__database.purge_done, on_purged, False)
+        
+    def archive_done_entries(self, older_than: int):
+        '''
+        Moves entries done for longer than older_than seconds out of the table into the archive,
+        they are taken out of the list once the database moved them
+        
+        Args:
+            older_than(int): seconds since an entry was marked done
+        '''
+        def on_archived(result: tuple[bool, list]):
+            successful, ids = result
+            self.__apply_deleted_ids(ids) # batches before a failure did move
+            if ids:
+                self.__clear_journal()
+            if not successful:
+                self.__error_callback("Failed To Archive Entries")
+        self.__run_write(lambda: self.__database.archive_done(older_than), on_archived)
+    
+    def get_archived_entries(self, on_result: Callable, after_id: int = 0, limit: int = 100):
+        '''
+        Reads a page of the archive, the archive is never part of the entry list
+        
+        Args:
+            on_result(Callable): called with a list of ToDoEntry, empty after the last page
+            after_id(int): OPTIONAL _ID of the last archived entry already shown
+            limit(int): OPTIONAL entries per page
+        '''
+        def on_fetched(result: tuple[bool, list]):
+            successful, entries = result
+            if not successful:
+                self.__error_callback("Failed To Get Archive")
+                return
+            on_result([ToDoEntry(*entry) for entry in entries])
+        self.__run_read(lambda: self.__database.get_archived(after_id, limit), on_fetched)
+    
+    def restore_archived_entries(self, ids: Iterable[int], on_restored: Callable = None):
+        '''
+        Moves archived entries back into the table, they show up in the list if they are in the current view
+        
+        Args:
+            ids(Iterable[int]): _IDs of archived entries
+            on_restored(Callable): OPTIONAL called with a bool, was the restore sucsesfull
+        '''
+        ids = list(ids)
+        
+        def on_done(result: tuple[bool, list]):
+            successful, entries = result
+            if not successful:
+                self.__error_callback("Failed To Restore Entries")
+            else:
+                self.__apply_rows(entries)
+            if on_restored is not None:
+                on_restored(successful)
+        self.__run_write(lambda: self.__database.restore_archived(ids), on_done)
+    
+    def get_entry_info(self, index: int, on_result: Callable):
+        '''
+        Gets the info text of an entry, the list querries leave it out so its read by _ID when its needed
+        and the last INFO_CACHE_SIZE are cached
+        
+        Args:
+            index(int): index of the entry in listbox
+            on_result(Callable): called with the info str, right away when its cached
+        '''
+        entry: ToDoEntry = self.__entry_list[index]
+        if entry.get_info() is not None:# added here or needed by the journal, it has it already
+            on_result(entry.get_info())
+            return
+        id: int = entry.get_id()
+        info: str = self.__info_cache.get(id)
+        if info is not None:
+            self.__info_cache.move_to_end(id)
+            on_result(info)
+            return
+        
+        def on_fetched(result: tuple[bool, list]):
+            successful, rows = result
+            if not successful:
+                self.__error_callback("Failed To Get Entry")
+                return
+            info: str = (rows[0][1] or "") if rows else "" # deleted meanwhile
+            if rows:
+                self.__info_cache[id] = info
+                if len(self.__info_cache) > ToDoLogic.INFO_CACHE_SIZE:
+                    self.__info_cache.popitem(last=False)
+            on_result(info)
+        self.__run_read(lambda: self.__database.get_info([id]), on_fetched)
+    
+    def get_entry(self, index: int) -> ToDoEntry:
+        '''
+        Args:
+            index(int): index of the entry in listbox
+        
+        Returns:
+            ToDoEntry: the entry, its info is only there when get_entry_info is used
+        '''
+        return self.__entry_list[index]
+    
+    def get_report(self, on_result: Callable, period: str = "day", days: int = 30, top: int = 10):
+        '''
+        Builds a ToDoReport on the worker thread, only for the local database file
+        
+        Args:
+            on_result(Callable): called with the report dict, None if it couldnt be built
+            period(str): OPTIONAL "day" or "week" completion buckets
+            days(int): OPTIONAL completion for this many days back, 0 = all of it
+            top(int): OPTIONAL longest open entries and most used words to list
+        '''
+        if self.__database is not DatabaseManager:
+            self.__error_callback("Reports Need The Local Database")
+            on_result(None)
+            return
+        import ToDoReport # imports ToDoCore, loaded on the first report
+        
+        def on_built(result: tuple[bool, dict]):
+            successful, report = result
+            if not successful:
+                self.__error_callback("Failed To Build Report")
+            on_result(report if successful else None)
+        self.__run_read(lambda: ToDoReport.build_report(period, days, top), on_built)
+    
+    def get_done_status(self, index: int) -> bool:
+        '''
+        returns the completeion statsu for the entry
+        
+        Args:
+            index(int): index of the entry in listbox
+        
+        Returns:
+            bool: staus of the entry(complete(True) or not(False))
+        '''
+        return self.__entry_list[index].is_done()
+
+    def set_view(self, order: str = ORDER_ADDED, is_done: bool = None, date_from: int = None, date_to: int = None):
+        '''
+        Shows a filtered and sorted view of the entries, switching costs one indexed querry for the first page.
+        A search still shows every matching entry, the view is back once the search is cleared
+        
+        Args:
+            order(str): OPTIONAL ORDER_ADDED, ORDER_DATE or ORDER_TITLE
+            is_done(bool): OPTIONAL only done(True) or open(False) entries, DEFAULT None = both
+            date_from(int): OPTIONAL only entries created at or after this unix epoch time
+            date_to(int): OPTIONAL only entries created before this unix epoch time
+        '''
+        self.__view = MappingProxyType({"order": order, "is_done": is_done, "date_from": date_from, "date_to": date_to})
+        self.__has_more_before = False # starting from the top of the new view
+        self.__has_more_after = False
+        self.update_entry_list()
+    
+    def get_view(self) -> MappingProxyType:
+        '''
+        Returns:
+            MappingProxyType: arguments of the last set_view call, DEFAULT_VIEW if it wasnt called
+        '''
+        return self.__view
+    
+    def update_entry_list(self):
+        '''
+        Updates the entry_list of ToDoEntry objects 
+        AND GUI display in the listbox
+        '''
+        metrics: ToDoMetrics.Metrics = ToDoMetrics.ACTIVE
+        start: float = time.perf_counter() if metrics is not None else 0.0
+        self.__window_generation += 1
+        generation: int = self.__window_generation
+        
+        def on_fetched(result: tuple[bool, list]):
+            if generation != self.__window_generation:
+                return # a newer reload is on its way
+            successful, entries = result
+            if not successful:
+                self.__error_callback("Failed To Get Entry")
+                return # not updating GUI
+            
+            self.__entry_list = [ToDoEntry(*entry) for entry in entries]
+            self.__changes_since_sync = 0
+            self.__list_change_callback(ToDoLogic.CHANGE_RELOAD, ())
+            if metrics is not None:# from the call until the GUI shows the new list, worker queue time included
+                metrics.since("logic.update_entry_list", start)
+        self.__fetch_window(on_fetched)
+        
+    def verify_cache(self, on_result: Callable = None):
+        '''
+        Checks the cached entry_list against the database,
+        reloads the list if they dont match
+        
+        Args:
+            on_result(Callable): OPTIONAL called with a bool, was the cache consistent with the database
+        '''
+        def compare_key(entry: ToDoEntry) -> tuple:
+            return entry.get_id(), entry.get_title(), bool(entry.is_done())
+        generation: int = self.__window_generation
+        
+        def on_fetched(result: tuple[bool, list]):
+            if generation != self.__window_generation:
+                return # fetched for a window that was replaced meanwhile
+            successful, entries = result
+            if not successful:
+                self.__error_callback("Failed To Get Entry")
+                return
+            
+            self.__changes_since_sync = 0
+            cached: list[tuple] = [compare_key(entry) for entry in self.__entry_list]
+            stored: list[tuple] = [compare_key(ToDoEntry(*entry)) for entry in entries]
+            consistent: bool = cached == stored
+            if not consistent:
+                self.__entry_list = [ToDoEntry(*entry) for entry in entries]
+                self.__list_change_callback(ToDoLogic.CHANGE_RELOAD, ())
+            if on_result is not None:
+                on_result(consistent)
+        self.__fetch_window(on_fetched, True)
+    
+    def search(self, query: str):
+        '''
+        Shows the best matches for query instead of the table, an empty query goes back to the table
+        
+        Args:
+            query(str): search text
+        '''
+        query = query.strip()
+        if query == self.__search_query:
+            return
+        self.__search_query = query
+        self.__has_more_before = False # search results and the table window both start from the top
+        self.__has_more_after = False
+        if not query:
+            self.__entry_list = [] # back to the first page of the table
+        self.update_entry_list()
+        
+    def get_search_query(self) -> str:
+        '''
+        Returns:
+            str: current search text, empty when not searching
+        '''
+        return self.__search_query
+    
+    def apply_pending_changes(self):
+        '''
+        Applies changes pushed by a remote database(other clients edits) to the list.
+        Waits while own writes are in flight, the feed has those in server order too 
+        so applying everything after they are done ends in the same state as the server.
+        Called periodically when a scheduler is given, call it directly otherwise
+        '''
+        if self.__pending_writes > 0 or self.__has_unflushed():
+            return
+        while True:
+            try:
+                change, payload = self.__remote_changes.get_nowait()
+            except queue.Empty:
+                return
+            if change == ToDoLogic.CHANGE_RELOAD:# feed had a gap(reconnect), changes were missed
+                self.update_entry_list()
+            elif change == ToDoLogic.CHANGE_DELETE:
+                self.__apply_deleted_ids(payload)
+            else:
+                self.__apply_rows(payload)
+    
+    def __poll_changes(self):
+        if self.__closed:
+            return
+        self.apply_pending_changes()
+        self.__scheduler(ToDoLogic.CHANGE_POLL_MS, self.__poll_changes)
+    
+    def check_external_changes(self):
+        '''
+        Picks up changes other processes commited to the database file.
+        Only PRAGMA data_version is read while nothing changed, when it did just the rows
+        changed since the last seen revision(and deleted ids) are fetched and applied to the list.
+        Called every watch_ms when its set, call it directly otherwise
+        '''
+        if self.__checking or self.__pending_writes > 0 or self.__has_unflushed() or not hasattr(self.__database, "get_data_version"):
+            return
+        self.__checking = True
+        data_version: int = self.__data_version
+        revision: int = self.__revision
+        
+        def check() -> tuple[int, tuple]:
+            version: int = self.__database.get_data_version()
+            if version == data_version:
+                return version, None
+            return version, self.__database.get_changes_since(revision)
+        
+        def on_checked(result: tuple[int, tuple]):
+            self.__checking = False
+            version, changes = result
+            if changes is None:
+                return
+            successful, new_revision, rows, deleted_ids = changes
+            if not successful:
+                return # data_version stays old so the next check tries again
+            self.__data_version = version
+            self.__revision = new_revision
+            if rows is None:# deletes that long ago arent known any more
+                self.update_entry_list()
+                return
+            # own writes since the last check come back too, applying them again changes nothing
+            self.__apply_deleted_ids(deleted_ids)
+            self.__apply_rows(rows)
+        self.__run_read(check, on_checked, (data_version, (False, revision, [], [])))
+    
+    def __poll_external_changes(self):
+        if self.__closed:
+            return
+        self.check_external_changes()
+        self.__scheduler(self.__watch_ms, self.__poll_external_changes)
+        
+    def __apply_rows(self, rows: list):
+        '''
+        Inserts or updates entries from database rows changed elsewhere, new rows outside of the window are ignored
+        
+        Args:
+            rows(list): database rows
+        '''
+        positions: dict[int, int] = {entry.get_id(): index for index, entry in enumerate(self.__entry_list)}
+        updated: list[ToDoEntry] = []
+        added: list[ToDoEntry] = []
+        left: list[int] = [] # changed so they are not in the view any more
+        for row in rows:
+            entry: ToDoEntry = ToDoEntry(*row)
+            index: int = positions.get(entry.get_id(), -1)
+            if index >= 0:
+                current: ToDoEntry = self.__entry_list[index]
+                if (current.get_title(), bool(current.is_done())) == (entry.get_title(), bool(entry.is_done())):
+                    continue # own changes come back through the feed too
+                if not self.__search_query and not self.__in_view(entry):
+                    left.append(entry.get_id())
+                    continue
+                self.__entry_list[index] = entry
+                updated.append(entry)
+            else:
+                self.__info_cache.pop(entry.get_id(), None) # new row, maybe with a reused _ID
+                if self.__accepts_new_entry(entry):
+                    added.append(entry)
+        if left:
+            self.__apply_deleted_ids(left)
+        if updated:
+            self.__notify_entries_updated(updated)
+        if added:
+            self.__restore_entries(added)
+            self.__trim_window(True)
+    
+    def __on_rows_read(self, result: tuple[bool, list]):
+        if not result[0]:
+            self.__error_callback("Failed To Get Entry")
+            return
+        self.__apply_rows(result[1])
+    
+    def __apply_deleted_ids(self, ids: list[int]):
+        '''
+        Removes entries deleted elsewhere
+        
+        Args:
+            ids(list[int]): deleted _IDs
+        '''
+        deleted: set[int] = set(ids)
+        for id in deleted:# the _ID can be given to a new entry
+            self.__info_cache.pop(id, None)
+        indices: tuple[int] = tuple(index for index, entry in enumerate(self.__entry_list) if entry.get_id() in deleted)
+        if not indices:
+            return
+        for index in reversed(indices):
+            del self.__entry_list[index]
+        self.__list_change_callback(ToDoLogic.CHANGE_DELETE, indices)
+    
+    def __accepts_new_entry(self, entry: ToDoEntry) -> bool:
+        '''
+        Is a new entry inside the loaded window
+        
+        Args:
+            entry(ToDoEntry): entry added elsewhere
+        
+        Returns:
+            bool: should it be shown in the list
+        '''
+        if self.__search_query:
+            return False # not known if it matches, it shows up when the search runs again
+        if not self.__in_view(entry):
+            return False
+        key: tuple = self.__entry_key(entry)
+        if self.__has_more_after and (not self.__entry_list or key > self.__entry_key(self.__entry_list[-1])):
+            return False
+        if self.__has_more_before and (not self.__entry_list or key < self.__entry_key(self.__entry_list[0])):
+            return False
+        return True
+    
+    def __in_view(self, entry: ToDoEntry) -> bool:
+        '''
+        Does an entry pass the filters of the current view
+        '''
+        view: MappingProxyType = self.__view
+        if view["is_done"] is not None and bool(entry.is_done()) != view["is_done"]:
+            return False
+        if view["date_from"] is not None and entry.get_timestamp() < view["date_from"]:
+            return False
+        if view["date_to"] is not None and entry.get_timestamp() >= view["date_to"]:
+            return False
+        return True
+    
+    def __entry_key(self, entry: ToDoEntry) -> tuple:
+        '''
+        Sort key of an entry in the current view, the same values get_view takes as a cursor
+        '''
+        order: str = self.__view["order"]
+        if order == ToDoLogic.ORDER_DATE:
+            return entry.get_timestamp(), entry.get_id()
+        if order == ToDoLogic.ORDER_TITLE:
+            return entry.get_title(), entry.get_id()
+        return (entry.get_id(),)
+    
+    def is_paged(self) -> bool:
+        '''
+        Returns:
+            bool: is only a window of the entries kept in memory
+        '''
+        return self.__page_size > 0
+    
+    def has_more_before(self) -> bool:
+        '''
+        Returns:
+            bool: are there entries before the loaded window
+        '''
+        return self.__has_more_before
+    
+    def has_more_after(self) -> bool:
+        '''
+        Returns:
+            bool: are there entries after the loaded window
+        '''
+        return self.__has_more_after
+    
+    def load_next_page(self) -> bool:
+        '''
+        Appends the next page to the window, drops pages from the start if the window gets too big
+        
+        Returns:
+            bool: was a page requested
+        '''
+        if not self.__has_more_after or self.__loading_page:
+            return False
+        cursor: tuple = self.__entry_key(self.__entry_list[-1]) if self.__entry_list else None
+        view: MappingProxyType = self.__view # the cursor only fits this view, the job runs later
+        generation: int = self.__window_generation
+        
+        def on_fetched(result: tuple[bool, list]):
+            self.__loading_page = False
+            if generation != self.__window_generation:
+                return # the window was reloaded meanwhile, the page belongs to the old one
+            successful, entries = result
+            if not successful:
+                self.__error_callback("Failed To Get Entry")
+                return
+            
+            self.__has_more_after = len(entries) > self.__page_size
+            start: int = len(self.__entry_list)
+            self.__entry_list.extend(ToDoEntry(*entry) for entry in entries[:self.__page_size])
+            if len(self.__entry_list) == start:
+                return
+            self.__list_change_callback(ToDoLogic.CHANGE_INSERT, tuple(range(start, len(self.__entry_list))))
+            self.__trim_window(True)
+        self.__loading_page = True
+        # asking for one extra row to know if there is more after this page
+        self.__run_read(lambda: self.__database.get_view(cursor=cursor, limit=self.__page_size + 1, **view), on_fetched)
+        return True
+    
+    def load_previous_page(self) -> bool:
+        '''
+        Prepends the previous page to the window, drops pages from the end if the window gets too big
+        
+        Returns:
+            bool: was a page requested
+        '''
+        if not self.__has_more_before or not self.__entry_list or self.__loading_page:
+            return False
+        cursor: tuple = self.__entry_key(self.__entry_list[0])
+        view: MappingProxyType = self.__view # the cursor only fits this view, the job runs later
+        generation: int = self.__window_generation
+        
+        def on_fetched(result: tuple[bool, list]):
+            self.__loading_page = False
+            if generation != self.__window_generation:
+                return # the window was reloaded meanwhile, the page belongs to the old one
+            successful, entries = result
+            if not successful:
+                self.__error_callback("Failed To Get Entry")
+                return
+            
+            self.__has_more_before = len(entries) > self.__page_size
+            entries = entries[:self.__page_size]
+            if not entries:
+                return
+            entries.reverse() # rows come closest first
+            self.__entry_list[0:0] = [ToDoEntry(*entry) for entry in entries]
+            self.__list_change_callback(ToDoLogic.CHANGE_INSERT, tuple(range(len(entries))))
+            self.__trim_window(False)
+        self.__loading_page = True
+        self.__run_read(lambda: self.__database.get_view(cursor=cursor, descending=True, limit=self.__page_size + 1, **view), on_fetched)
+        return True
+    
+    def __load_last_page(self):
+        '''
+        Moves the window to the end of the view
+        '''
+        self.__window_generation += 1
+        generation: int = self.__window_generation
+        view: MappingProxyType = self.__view
+        
+        def on_fetched(result: tuple[bool, list]):
+            if generation != self.__window_generation:
+                return
+            successful, entries = result
+            if not successful:
+                self.__error_callback("Failed To Get Entry")
+                return
+            
+            self.__has_more_before = len(entries) > self.__page_size
+            self.__has_more_after = False
+            entries = entries[:self.__page_size]
+            entries.reverse()
+            self.__entry_list = [ToDoEntry(*entry) for entry in entries]
+            self.__list_change_callback(ToDoLogic.CHANGE_RELOAD, ())
+        self.__run_read(lambda: self.__database.get_view(descending=True, limit=self.__page_size + 1, **view), on_fetched)
+        
+    def __trim_window(self, from_front: bool):
+        '''
+        Drops entries that dont fit in the window buffer any more
+        
+        Args:
+            from_front(bool): drop from the start of the window(after loading the next page) or the end
+        '''
+        if not self.is_paged():
+            return
+        excess: int = len(self.__entry_list) - self.__buffer_size
+        if excess <= 0:
+            return
+        if from_front:
+            del self.__entry_list[:excess]
+            self.__has_more_before = True
+            self.__list_change_callback(ToDoLogic.CHANGE_DELETE, tuple(range(excess)))
+        else:
+            start: int = len(self.__entry_list) - excess
+            del self.__entry_list[start:]
+            self.__has_more_after = True
+            self.__list_change_callback(ToDoLogic.CHANGE_DELETE, tuple(range(start, start + excess)))
+    
+    def __fetch_window(self, on_fetched: Callable, exact: bool = False):
+        '''
+        Gets the rows for the current window from the database, the whole table if paging is off
+        
+        Args:
+            on_fetched(Callable): called with tuple(bool, list), was the get sucsesfull and the list of rows
+            exact(bool): OPTIONAL as many rows as the window has, not at least a page. For comparing,
+                a window a delete made shorter than a page would get the next row too and never match
+        '''
+        if self.__search_query:
+            query: str = self.__search_query
+            
+            def on_search(result: tuple[bool, list]):
+                if query == self.__search_query:# skipping results for text that was already changed
+                    on_fetched(result)
+            self.__run_read(lambda: self.__database.search(query, ToDoLogic.SEARCH_LIMIT), on_search)
+            return
+        view: MappingProxyType = self.__view # read now, the job runs after later set_view calls
+        if not self.is_paged():
+            if view == ToDoLogic.DEFAULT_VIEW:
+                self.__run_read(self.__database.get_entries, on_fetched)
+            else:
+                self.__run_read(lambda: self.__database.get_view(**view), on_fetched)
+            return
+        
+        # refetching from the first entry of the window on, it stays where it is
+        cursor: tuple = self.__entry_key(self.__entry_list[0]) if self.__has_more_before and self.__entry_list else None
+        limit: int = len(self.__entry_list) if exact and self.__entry_list else max(len(self.__entry_list), self.__page_size)
+        
+        def on_window_fetched(result: tuple[bool, list]):
+            successful, entries = result
+            if successful:
+                self.__has_more_before = cursor is not None
+                self.__has_more_after = len(entries) > limit
+                entries = entries[:limit]
+            on_fetched((successful, entries))
+        self.__run_read(lambda: self.__database.get_view(cursor=cursor, inclusive=True, limit=limit + 1, **view), on_window_fetched)
+    
+    def __drop_entries(self, entries: list[ToDoEntry]):
+        '''
+        Rolls back optimistically added entries
+        
+        Args:
+            entries(list[ToDoEntry]): entries to take out of the list, if they are still in it
+        '''
+        dropped: set[int] = set(map(id, entries))
+        indices: tuple[int] = tuple(index for index, entry in enumerate(self.__entry_list) if id(entry) in dropped)
+        if not indices:
+            return
+        for index in reversed(indices):
+            del self.__entry_list[index]
+        self.__list_change_callback(ToDoLogic.CHANGE_DELETE, indices)
+    
+    def __restore_entries(self, entries: list[ToDoEntry]):
+        '''
+        Rolls back optimistically removed entries, putting them back in view order
+        
+        Args:
+            entries(list[ToDoEntry]): entries to put back
+        '''
+        if not entries:
+            return
+        restored: set[int] = set(map(id, entries))
+        self.__entry_list.extend(entries)
+        self.__entry_list.sort(key=self.__entry_key)
+        indices: tuple[int] = tuple(index for index, entry in enumerate(self.__entry_list) if id(entry) in restored)
+        self.__list_change_callback(ToDoLogic.CHANGE_INSERT, indices)
+        
+    def __notify_entries_updated(self, entries: list[ToDoEntry]):
+        '''
+        Tells the GUI that entries changed in place, skipping ones no longer in the list
+        
+        Args:
+            entries(list[ToDoEntry]): changed entries
+        '''
+        updated: set[int] = set(map(id, entries))
+        indices: tuple[int] = tuple(index for index, entry in enumerate(self.__entry_list) if id(entry) in updated)
+        if indices:
+            self.__list_change_callback(ToDoLogic.CHANGE_UPDATE, indices)
+    
+    def __record(self, operation: str, entries: list[ToDoEntry], status: bool):
+        '''
+        Puts a new operation on the undo stack, anything undone before it cant be redone any more
+        
+        Args:
+            operation(str): JOURNAL_STATUS or JOURNAL_DELETE
+            entries(list[ToDoEntry]): affected entries
+            status(bool): new status for JOURNAL_STATUS
+        '''
+        self.__undo_stack.append((operation, entries, status))
+        for _, dropped, _ in self.__undo_stack[:-ToDoLogic.JOURNAL_SIZE]:
+            for entry in dropped:
+                self.__deleted_done_at.pop(id(entry), None)
+        del self.__undo_stack[:-ToDoLogic.JOURNAL_SIZE]
+        self.__redo_stack.clear()
+    
+    def __clear_journal(self):
+        self.__undo_stack.clear()
+        self.__redo_stack.clear()
+        self.__deleted_done_at.clear()
+    
+    def __has_unflushed(self) -> bool:
+        return bool(self.__unflushed_status or self.__unflushed_deletes or self.__unflushed_reinserts)
+    
+    def __journal_status(self, entries: list[ToDoEntry], status: bool):
+        '''
+        Sets the status of entries and journals it, only the first change since the last flush remembers the stored status
+        '''
+        for entry in entries:
+            self.__unflushed_status.setdefault(id(entry), (entry, bool(entry.is_done())))
+            entry.set_done(status)
+        self.__schedule_flush()
+    
+    def __journal_delete(self, entries: list[ToDoEntry]):
+        for entry in entries:
+            if self.__unflushed_reinserts.pop(id(entry), None) is None:# an undone delete that wasnt written yet just stays deleted
+                self.__unflushed_deletes[id(entry)] = entry
+        self.__schedule_flush()
+    
+    def __journal_reinsert(self, entries: list[ToDoEntry]):
+        for entry in entries:
+            if self.__unflushed_deletes.pop(id(entry), None) is None:# deletes that werent written yet are just dropped
+                self.__unflushed_reinserts[id(entry)] = entry
+        self.__schedule_flush()
+    
+    def __schedule_flush(self):
+        '''
+        Flushes after COALESCE_MS, right away when running synchronously
+        '''
+        if self.__scheduler is None:
+            self.flush_changes()
+        elif not self.__flush_scheduled:
+            self.__flush_scheduled = True
+            self.__scheduler(ToDoLogic.COALESCE_MS, self.__on_flush_timer)
+    
+    def __on_flush_timer(self):
+        self.__flush_scheduled = False
+        if not self.__closed:
+            self.flush_changes()
+    
+    def __show_journal_entries(self, entries: list[ToDoEntry], deleted: bool = False):
+        '''
+        Shows entries changed by undo or redo where they belong now. 
+        A reload since the change made new ToDoEntry objects, those are swapped for the journaled ones by _ID
+        
+        Args:
+            entries(list[ToDoEntry]): journaled entries
+            deleted(bool): OPTIONAL they were deleted again, take them out of the list
+        '''
+        journaled: dict[int, ToDoEntry] = {id(entry): entry for entry in entries}
+        by_id: dict[int, ToDoEntry] = {entry.get_id(): entry for entry in entries if entry.get_id() > 0}
+        found: set[int] = set()
+        updated: list[ToDoEntry] = []
+        left: list[int] = []
+        for index, current in enumerate(self.__entry_list):
+            entry: ToDoEntry = journaled.get(id(current)) or by_id.get(current.get_id())
+            if entry is None or id(entry) in found:
+                continue
+            found.add(id(entry))
+            self.__entry_list[index] = entry
+            if deleted or not (self.__search_query or self.__in_view(entry)):
+                left.append(index)
+            else:
+                updated.append(entry)
+        if left:
+            for index in reversed(left):
+                del self.__entry_list[index]
+            self.__notify_change(ToDoLogic.CHANGE_DELETE, tuple(left))
+        if updated:
+            self.__notify_entries_updated(updated)
+        if deleted:
+            return
+        added: list[ToDoEntry] = [entry for entry in entries if id(entry) not in found and self.__accepts_new_entry(entry)]
+        if added:
+            self.__restore_entries(added)
+            self.__trim_window(True)
+    
+    def __run_db(self, job: Callable, on_done: Callable, failed):
+        '''
+        Runs a database job on the worker thread, or right away when running synchronously
+        
+        Args:
+            job(Callable): function without arguments doing the database work
+            on_done(Callable): called with the jobs return value on the GUI thread
+            failed: passed to on_done instead when the job raised, it has to look like the jobs own failure
+        '''
+        if self.__worker is None:
+            try:
+                result = job()
+            except Exception as ex:
+                print(ex)
+                result = failed
+            on_done(result)
+        else:
+            self.__worker.submit(job, on_done, failed)
+    
+    def __run_write(self, job: Callable, on_done: Callable, failed = (False, None)):
+        '''
+        __run_db for jobs that change the database, journaled changes are written first.
+        on_done always runs, with failed if the job raised
+        '''
+        self.flush_changes()
+        self.__write_generation += 1
+        self.__pending_writes += 1
+        
+        def on_written(result):
+            self.__pending_writes -= 1
+            on_done(result)
+        self.__run_db(job, on_written, failed)
+    
+    def __run_read(self, job: Callable, on_done: Callable, failed = (False, None)):
+        '''
+        __run_db for jobs that only read. If a write was queued while the read was in flight
+        the result can be older than the cached list, so the read is queued again behind the write.
+        Journaled changes are written first, on_done always runs, with failed if the job raised
+        '''
+        self.flush_changes()
+        generation: int = self.__write_generation
+        
+        def on_read(result):
+            if generation != self.__write_generation:
+                self.__run_read(job, on_done, failed)
+                return
+            on_done(result)
+        self.__run_db(job, on_read, failed)
+    
+    def __notify_change(self, change: str, indices: tuple[int]):
+        '''
+        Passes an incremental change to the GUI and runs the periodic resync if its enabled
+        
+        Args:
+            change(str): one of the CHANGE_* types
+            indices(tuple[int]): affected indices in the entry list
+        '''
+        self.__list_change_callback(change, indices)
+        self.__changes_since_sync += 1
+        if self.__resync_every > 0 and self.__changes_since_sync >= self.__resync_every:
+            self.verify_cache()
+        
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
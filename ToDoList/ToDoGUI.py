@@ -0,0 +1,627 @@
+import tkinter as tk #GUI
+from tkinter import Button, Toplevel, Listbox, Menu, messagebox
+from types import MappingProxyType #MappingProxyType is a immutable dictionary
+from datetime import datetime
+from typing import Callable
+from ToDoCore import DatabaseManager, ToDoLogic
+import ToDoMetrics
+
+class ToDoGUI(tk.Tk):   
+    # Some default configs to be used in the GUI
+    # Temorary solution. These setting should be in a config or xml file.
+    DEFAULT_CONGIFS: MappingProxyType = MappingProxyType({
+        "root_w": 400,
+        "root_h": 500,
+        "add_box_w": 200,
+        "add_box_h": 100,
+        "root_title": "ToDo List",
+        "main_font" : ("Helvetica", 25),
+        "detail_font": ("Helvetica", 11),# creation date and info of the selected entry under the list
+        "main_colour": "#ffd900",
+        "second_colour": "#FFCC00",
+        "list_box_row_max": 10,# this should really be calculated based on root_h and front size
+        "page_size": 100,# entries loaded from the database at a time, the listbox holds at most 3 pages
+        "prefetch_rows": 10,# loads the next/previous page when the view gets this close to the edge of the loaded rows
+        "search_delay_ms": 300,# waits for the user to stop typing this long before searching
+        "watch_ms": 1000,# how often to check for changes other ToDoList windows made to the database file
+        "archive_after_days": 30,# Archive Old Done moves entries done for longer than this
+        "archive_page_size": 100,# archived entries loaded at a time in the archive window
+        }) 
+    # View toggle choices, label -> set_view argument
+    VIEW_STATUSES: MappingProxyType = MappingProxyType({"All": None, "Open": False, "Done": True})
+    VIEW_ORDERS: MappingProxyType = MappingProxyType({"Added": ToDoLogic.ORDER_ADDED, "Date": ToDoLogic.ORDER_DATE, "Title": ToDoLogic.ORDER_TITLE})
+    VIEW_PERIODS: MappingProxyType = MappingProxyType({"Any Time": None, "Today": 0, "Last 7 Days": 7, "Last 30 Days": 30}) # days before today
+    
+    def __init__(self, database = DatabaseManager):
+        '''
+        Args:
+            database: OPTIONAL where entries are stored, a ToDoServer.RemoteDatabase to share a list, DEFAULT local file
+        '''
+        super().__init__()#Tk parent class init
+        
+        self.__displayed: list[str] = [] # strings currently shown in the listbox, used to diff reloads
+        self.__logic = ToDoLogic(self.reload_list, 
+                                 self.error_msgbox, 
+                                 page_size=ToDoGUI.DEFAULT_CONGIFS["page_size"],
+                                 scheduler=self.after,
+                                 database=database,
+                                 watch_ms=ToDoGUI.DEFAULT_CONGIFS["watch_ms"])# database work runs on a worker thread, results come back through Tk.after
+        self.__page_check_pending: bool = False
+        self.__search_after_id: str = None # pending Tk.after search, replaced on every key press
+
+        self.__create_main_window()
+        
+        # Windows opens in the top left of screen.
+        self.__offset_x = 0 
+        self.__offset_y = 0
+    
+    def error_msgbox(self, msg:str, title:str = "Error!"):
+        '''
+        Easy way to display and error message in the GUI
+        
+        Args:
+            msg(str): message to display in the error box
+            title(srg): OPTIONAL Error Box Title DEFAULT = Error!
+        '''
+        messagebox.showerror(title, msg)
+    def __create_main_window(self):
+        def create_custom_title_bar():
+            def move_window(event):#allows me to move window
+                self.geometry('+%d+%d' % (event.x_root-self.__offset_x, event.y_root-self.__offset_y))
+                
+            def start_move(event):#calulates windows pos relative to mouse and not 0 0
+                self.__offset_x = event.x
+                self.__offset_y = event.y   
+                
+            self.overrideredirect(True)
+            # Create a custom frame for the title bar
+            title_bar = tk.Frame(self, bg=ToDoGUI.DEFAULT_CONGIFS["second_colour"], height=30)
+            title_bar.pack(fill=tk.X)
+            # Add a close button to exit the window
+            close_button = tk.Button(title_bar, 
+                                     text='X', 
+                                     bg=ToDoGUI.DEFAULT_CONGIFS["second_colour"], 
+                                     fg="black", 
+                                     relief='flat',
+                                     borderwidth=0,
+                                     command=self.destroy)
+            close_button.pack(side=tk.RIGHT)
+            
+            title_bar.bind("<ButtonPress-1>", start_move)
+            title_bar.bind("<B1-Motion>", move_window)
+            
+
+        #Main windows setup/styling
+        create_custom_title_bar()
+        self.title(ToDoGUI.DEFAULT_CONGIFS["root_title"])
+        self.geometry('%dx%d' % (ToDoGUI.DEFAULT_CONGIFS['root_w'], ToDoGUI.DEFAULT_CONGIFS['root_h'])) # parsing string into widthxheight string
+        self.config(bg=ToDoGUI.DEFAULT_CONGIFS["main_colour"]) #RGB
+        
+        #self.__list_objects: list[ToDoEntry] = [ToDoEntry("TEST One"), ToDoEntry("TEST Two")]
+        #self.__todo_list_items: tk.Variable = tk.Variable(value= self.__list_objects)
+        #Search box, filters the list as the user types
+        self.__search_var: tk.StringVar = tk.StringVar(self)
+        self.__search_var.trace_add("write", lambda *args: self.__on_search_changed())
+        search_entry = tk.Entry(self, 
+                                textvariable=self.__search_var, 
+                                bg=ToDoGUI.DEFAULT_CONGIFS["second_colour"],
+                                relief='flat')
+        search_entry.pack(fill=tk.X, padx=10, pady=5)
+        
+        #View toggles, every change is one indexed querry for the first page
+        view_bar = tk.Frame(self, bg=ToDoGUI.DEFAULT_CONGIFS["main_colour"])
+        view_bar.pack(fill=tk.X, padx=10)
+        self.__view_vars: list[tk.StringVar] = []
+        for choices in (ToDoGUI.VIEW_STATUSES, ToDoGUI.VIEW_PERIODS, ToDoGUI.VIEW_ORDERS):
+            var: tk.StringVar = tk.StringVar(self, next(iter(choices)))
+            menu = tk.OptionMenu(view_bar, var, *choices, command=lambda choice: self.__on_view_changed())
+            menu.configure(bg=ToDoGUI.DEFAULT_CONGIFS["second_colour"], relief='flat', highlightthickness=0)
+            menu.pack(side=tk.LEFT, expand=True, fill=tk.X)
+            self.__view_vars.append(var)
+        
+        self.__listbox: Listbox = Listbox(self)
+        self.__listbox.configure(font=ToDoGUI.DEFAULT_CONGIFS["main_font"],
+                                 bg = ToDoGUI.DEFAULT_CONGIFS["main_colour"],
+                                 borderwidth=0, 
+                                 highlightthickness=0,
+                                 activestyle = "none", # removes selection undeline
+                                 selectbackground = ToDoGUI.DEFAULT_CONGIFS["second_colour"],
+                                 selectforeground = "black",
+                                 ) 
+        self.__listbox.configure(yscrollcommand=self.__on_list_scroll,
+                                 selectmode=tk.EXTENDED)# shift/ctrl click to select many
+        self.__listbox.bind('<Double-1>', self.__on_even_doubleclick)
+        self.__listbox.bind('<Button-3>', self.__on_even_rightclick)
+        self.__listbox.bind('<Delete>', lambda event: self.__on_delete_selected())
+        self.__listbox.bind('<<ListboxSelect>>', lambda event: self.__show_details())
+        self.bind('<F5>', lambda event: self.refresh())
+        for sequence in ('<Control-z>', '<Control-Z>'):# caps lock on
+            self.bind(sequence, lambda event: self.__on_history_key(event, self.__logic.undo))
+        for sequence in ('<Control-y>', '<Control-Y>'):
+            self.bind(sequence, lambda event: self.__on_history_key(event, self.__logic.redo))
+        self.bind('<F9>', lambda event: self.__toggle_capture(ToDoMetrics.toggle_profiling, "cProfile", "ToDoProfile.prof"))
+        self.bind('<F10>', lambda event: self.__toggle_capture(ToDoMetrics.toggle_memory_tracing, "tracemalloc", "ToDoMemory.txt"))
+        
+        #Right click menu, works on all the selected entries
+        self.__context_menu: Menu = Menu(self, tearoff=0)
+        self.__context_menu.add_command(label="Mark Done", command=lambda: self.__on_mark_selected(True))
+        self.__context_menu.add_command(label="Mark Not Done", command=lambda: self.__on_mark_selected(False))
+        self.__context_menu.add_command(label="Delete", command=self.__on_delete_selected)
+        self.__context_menu.add_separator()
+        self.__context_menu.add_command(label="Delete All Done", command=self.__on_purge_done)
+        self.__context_menu.add_separator()
+        archive_label: str = f"Archive Done Older Than {ToDoGUI.DEFAULT_CONGIFS['archive_after_days']} Days"
+        self.__context_menu.add_command(label=archive_label, command=self.__on_archive_done)
+        self.__context_menu.add_command(label="Show Archive...", command=self.__show_archive)
+        self.__context_menu.add_command(label="Report...", command=self.__show_report)
+        #Same archive commands when clicking where there is no entry
+        self.__list_menu: Menu = Menu(self, tearoff=0)
+        self.__list_menu.add_command(label=archive_label, command=self.__on_archive_done)
+        self.__list_menu.add_command(label="Show Archive...", command=self.__show_archive)
+        self.__list_menu.add_command(label="Report...", command=self.__show_report)
+        self.__listbox.pack(fill=tk.X, padx=10)
+        
+        #Details of the selected entry, info is only read from the database for this
+        self.__detail_var: tk.StringVar = tk.StringVar(self)
+        detail_label = tk.Label(self, 
+                                textvariable=self.__detail_var,
+                                font=ToDoGUI.DEFAULT_CONGIFS["detail_font"],
+                                bg=ToDoGUI.DEFAULT_CONGIFS["main_colour"],
+                                anchor="w",
+                                justify=tk.LEFT,
+                                wraplength=ToDoGUI.DEFAULT_CONGIFS["root_w"] - 20)
+        detail_label.pack(fill=tk.X, padx=10)
+       
+        
+        self.reload_list()
+        
+        
+        
+        #Add ToDo Item Button
+        close_button = Button(self, 
+                                     text='+', 
+                                     font = (ToDoGUI.DEFAULT_CONGIFS["main_font"][0], 50),#just want the font, we using custom size
+                                     bg=ToDoGUI.DEFAULT_CONGIFS["main_colour"], #makes it look transparent
+                                     fg="green", 
+                                     activebackground=ToDoGUI.DEFAULT_CONGIFS["main_colour"],#makes it look transparent when clicked
+                                     relief='flat',
+                                     borderwidth=0,
+                                     command=self.__add_todo)
+        close_button.pack()
+
+        
+    def __on_even_doubleclick(self, event:tk.Event):
+        
+        #prevents errors when clicking empty box
+        if(len(self.__listbox.curselection()) == 0):
+            return
+        
+        index:int = event.widget.curselection()[0] 
+        if(self.__logic.get_done_status(index)):
+            if messagebox.askyesno("Change", "Do you want to mark it as not done?"):
+                self.__logic.change_entry_status(index, False)  
+        else:
+            self.__logic.change_entry_status(index, True)
+
+ 
+        
+    def __on_even_rightclick(self, event: tk.Event):
+        index: int = self.__listbox.nearest(event.y)
+        if not self.__listbox.selection_includes(index):# clicking outside the selection selects only that element
+            self.__listbox.selection_clear(0,tk.END)
+            self.__listbox.selection_set(index)
+        #prvents errors when clicking empty box
+        if(len(self.__listbox.curselection()) == 0):
+            self.__list_menu.tk_popup(event.x_root, event.y_root)
+            return
+        self.__context_menu.tk_popup(event.x_root, event.y_root)
+        
+        
+    def __on_history_key(self, event: tk.Event, action: Callable):
+        '''
+        Ctrl+Z/Ctrl+Y undo or redo the last list change, but not while typing e.g. in the search box,
+        there it would silently bring back a deleted entry or flip one back
+        
+        Args:
+            event(tk.Event): the key event, bound on the window so it comes from any widget in it
+            action(Callable): ToDoLogic.undo or ToDoLogic.redo
+        '''
+        if isinstance(event.widget, (tk.Entry, tk.Text)):
+            return
+        action()
+    
+    def __show_details(self):
+        indices: tuple[int] = self.__listbox.curselection()
+        if len(indices) != 1:
+            self.__detail_var.set("")
+            return
+        index: int = indices[0]
+        entry = self.__logic.get_entry(index)
+        created: str = f"Created {entry.get_creation_date():%Y-%m-%d %H:%M}"
+        self.__detail_var.set(created)
+        
+        def on_info(info: str):
+            # the list can change while the info is read, only showing it if the entry is still the selected one
+            if self.__listbox.curselection() == (index,) and index < self.__listbox.size() and self.__logic.get_entry(index) is entry:
+                self.__detail_var.set(f"{created}\n{info}" if info else created)
+        self.__logic.get_entry_info(index, on_info)
+        
+    def __on_search_changed(self):
+        # debouncing, only the last key press within search_delay_ms runs a search
+        if self.__search_after_id is not None:
+            self.after_cancel(self.__search_after_id)
+        self.__search_after_id = self.after(ToDoGUI.DEFAULT_CONGIFS["search_delay_ms"], self.__run_search)
+        
+    def __on_view_changed(self):
+        status, period, order = (var.get() for var in self.__view_vars)
+        date_from: int = None
+        days: int = ToDoGUI.VIEW_PERIODS[period]
+        if days is not None:
+            midnight: datetime = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            date_from = int(midnight.timestamp()) - days * 24 * 60 * 60
+        self.__logic.set_view(ToDoGUI.VIEW_ORDERS[order], ToDoGUI.VIEW_STATUSES[status], date_from)
+        
+    def __run_search(self):
+        self.__search_after_id = None
+        self.__logic.search(self.__search_var.get())
+        
+    def __on_new_entry(self, entry: MappingProxyType):
+        self.__logic.add_new_entry(entry)
+        
+    def __on_delete_selected(self):
+        indices: tuple[int] = self.__listbox.curselection()
+        if len(indices) == 1:
+            if messagebox.askyesno("", f"Are You sure you want to delete {self.__listbox.get(indices[0])}?"):
+                self.__logic.remove_entry(indices[0])
+        elif len(indices) > 1:
+            if messagebox.askyesno("", f"Are You sure you want to delete {len(indices)} entries?"):
+                self.__logic.remove_entries(indices)
+    
+    def __on_mark_selected(self, status: bool):
+        self.__logic.change_entries_status(self.__listbox.curselection(), status)
+        
+    def __on_archive_done(self):
+        self.__logic.archive_done_entries(ToDoGUI.DEFAULT_CONGIFS["archive_after_days"] * 24 * 60 * 60)
+    
+    def __show_archive(self):
+        '''
+        Window listing archived entries a page at a time, selected ones can be restored
+        '''
+        archive_window: Toplevel = Toplevel(self)
+        archive_window.title("Archive")
+        archive_window.config(bg=ToDoGUI.DEFAULT_CONGIFS["main_colour"])
+        archived: list = [] # ToDoEntry objects in listbox order
+        
+        listbox: Listbox = Listbox(archive_window, 
+                                   selectmode=tk.EXTENDED,
+                                   bg=ToDoGUI.DEFAULT_CONGIFS["main_colour"],
+                                   borderwidth=0,
+                                   highlightthickness=0,
+                                   selectbackground=ToDoGUI.DEFAULT_CONGIFS["second_colour"],
+                                   selectforeground="black")
+        listbox.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        def on_page(entries: list):
+            if not archive_window.winfo_exists():
+                return # closed before the page came back
+            archived.extend(entries)
+            listbox.insert(tk.END, *(f"{entry.get_creation_date():%Y-%m-%d}  {entry}" for entry in entries))
+            if len(entries) < ToDoGUI.DEFAULT_CONGIFS["archive_page_size"]:
+                more_button.configure(state=tk.DISABLED)
+        
+        def load_more():
+            after_id: int = archived[-1].get_id() if archived else 0
+            self.__logic.get_archived_entries(on_page, after_id, ToDoGUI.DEFAULT_CONGIFS["archive_page_size"])
+            
+        def restore_selected():
+            indices: tuple[int] = listbox.curselection()
+            if not indices:
+                return
+            ids: list[int] = [archived[index].get_id() for index in indices]
+            
+            def on_restored(successful: bool):
+                if not successful or not archive_window.winfo_exists():
+                    return
+                for index in reversed(indices):
+                    listbox.delete(index)
+                    del archived[index]
+            self.__logic.restore_archived_entries(ids, on_restored)
+        
+        more_button: Button = Button(archive_window, text="More", relief='flat', command=load_more)
+        more_button.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=10, pady=5)
+        Button(archive_window, text="Restore", relief='flat', command=restore_selected).pack(side=tk.LEFT, expand=True, fill=tk.X, padx=10, pady=5)
+        load_more()
+        
+    def __show_report(self):
+        '''
+        Window with the statistics report, switching the period builds it again(cached until the database changes)
+        '''
+        import ToDoReport
+        report_window: Toplevel = Toplevel(self)
+        report_window.title("Report")
+        report_window.config(bg=ToDoGUI.DEFAULT_CONGIFS["main_colour"])
+        period_var: tk.StringVar = tk.StringVar(report_window, ToDoReport.PERIOD_DAY)
+        
+        text: tk.Text = tk.Text(report_window, 
+                                font=("Courier", 10),
+                                bg=ToDoGUI.DEFAULT_CONGIFS["main_colour"],
+                                borderwidth=0,
+                                highlightthickness=0,
+                                width=60,
+                                height=30)
+        
+        def on_report(report: dict):
+            if not report_window.winfo_exists():
+                return # closed before the report was done
+            text.configure(state=tk.NORMAL)
+            text.delete("1.0", tk.END)
+            text.insert(tk.END, ToDoReport.format_report(report) if report is not None else "Failed to build the report")
+            text.configure(state=tk.DISABLED)
+        
+        def load(period: str):
+            text.configure(state=tk.NORMAL)
+            text.delete("1.0", tk.END)
+            text.insert(tk.END, "Building report...")
+            text.configure(state=tk.DISABLED)
+            days: int = 30 if period == ToDoReport.PERIOD_DAY else 26 * 7 # half a year of weeks
+            self.__logic.get_report(on_report, period, days)
+        
+        period_menu = tk.OptionMenu(report_window, period_var, ToDoReport.PERIOD_DAY, ToDoReport.PERIOD_WEEK, command=load)
+        period_menu.configure(bg=ToDoGUI.DEFAULT_CONGIFS["second_colour"], relief='flat', highlightthickness=0)
+        period_menu.pack(fill=tk.X, padx=10, pady=5)
+        text.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        load(ToDoReport.PERIOD_DAY)
+        
+    def __on_purge_done(self):
+        if messagebox.askyesno("", "Are You sure you want to delete all done entries?"):
+            self.__logic.purge_done_entries()
+
+
+    def __toggle_capture(self, toggle, name: str, path: str):
+        # runtime profiling, started and stopped from the keyboard while the slow thing is happening
+        if toggle(path):
+            self.title(f"{ToDoGUI.DEFAULT_CONGIFS['root_title']} ({name} running)")
+        else:
+            self.title(ToDoGUI.DEFAULT_CONGIFS["root_title"])
+            messagebox.showinfo(name, f"Saved to {path}")
+            
+    @ToDoMetrics.timed("gui.reload_list")
+    def reload_list(self, change: str = ToDoLogic.CHANGE_RELOAD, indices: tuple[int] = ()):
+        '''
+        Reload the GUI ListBox display data
+        Gets the data from ToDoLogic
+        
+        Args:
+            change(str): OPTIONAL ToDoLogic.CHANGE_* type, DEFAULT reloads everything
+            indices(tuple[int]): OPTIONAL listbox indices affected by the change
+        '''
+        if change == ToDoLogic.CHANGE_INSERT:
+            top: int = self.__listbox.nearest(0)
+            for start, end in self.__index_runs(sorted(indices)):# one insert call per run of neighbouring rows
+                texts: list[str] = [self.__logic.get_entry_display_string(index) for index in range(start, end)]
+                self.__listbox.insert(start, *texts)
+                self.__displayed[start:start] = texts
+            # keeping the same rows in view when rows are added above them(previous page loaded)
+            self.__listbox.yview(max(top, 0) + sum(1 for index in indices if index <= top))
+        elif change == ToDoLogic.CHANGE_DELETE:
+            top: int = self.__listbox.nearest(0)
+            for start, end in reversed(self.__index_runs(sorted(indices))):# deleting from the back so the other indices stay valid
+                self.__listbox.delete(start, end - 1)
+                del self.__displayed[start:end]
+            self.__listbox.yview(max(top - sum(1 for index in indices if index < top), 0))
+        elif change == ToDoLogic.CHANGE_UPDATE:
+            for index in indices:
+                self.__replace_row(index, self.__logic.get_entry_display_string(index))
+        else:
+            self.__apply_display_diff(self.__logic.get_entry_display_strings())
+        
+        #Figures out the size of the list_box
+        list_box_size: int = self.__listbox.size()
+        
+        # Makig sure not to go over max size or the listbox pushes out the +(add) button out of view
+        if list_box_size > ToDoGUI.DEFAULT_CONGIFS["list_box_row_max"]:
+            list_box_size = ToDoGUI.DEFAULT_CONGIFS["list_box_row_max"]        
+        self.__listbox.config(height = list_box_size)
+      
+    @staticmethod
+    def __index_runs(indices: list[int]) -> list[tuple[int, int]]:
+        '''
+        Groups sorted indices into runs of neighbouring indices
+        
+        Args:
+            indices(list[int]): sorted indices
+        
+        Returns:
+            list[tuple[int, int]]: (start, end) pairs, end is exclusive
+        '''
+        runs: list[list[int]] = []
+        for index in indices:
+            if runs and runs[-1][1] == index:
+                runs[-1][1] += 1
+            else:
+                runs.append([index, index + 1])
+        return [(start, end) for start, end in runs]
+    
+    def __on_list_scroll(self, first: str, last: str):
+        '''
+        Listbox yscrollcommand, checks if the next/previous page needs loading once Tk is idle
+        
+        Args:
+            first(str): fraction of the list above the view
+            last(str): fraction of the list up to the bottom of the view
+        '''
+        if self.__logic.is_paged() and not self.__page_check_pending:
+            self.__page_check_pending = True
+            self.after_idle(self.__check_page_edges) # not loading from inside the scroll callback, the view is still updating
+    
+    def __check_page_edges(self):
+        '''
+        Loads more entries when the view is close to the start or end of the loaded rows
+        '''
+        self.__page_check_pending = False
+        size: int = self.__listbox.size()
+        if size == 0:
+            return
+        top: int = self.__listbox.nearest(0)
+        bottom: int = self.__listbox.nearest(self.__listbox.winfo_height())
+        prefetch: int = ToDoGUI.DEFAULT_CONGIFS["prefetch_rows"]
+        if self.__logic.has_more_after() and bottom >= size - 1 - prefetch:
+            self.__logic.load_next_page()
+        elif self.__logic.has_more_before() and top <= prefetch:
+            self.__logic.load_previous_page()
+    
+    def __replace_row(self, index: int, text: str):
+        '''
+        Listbox cant edit an item, so it gets replaced. Keeps the selection if it was selected
+        
+        Args:
+            index(int): listbox index
+            text(str): new display string
+        '''
+        selected: bool = self.__listbox.selection_includes(index)
+        self.__listbox.delete(index)
+        self.__listbox.insert(index, text)
+        self.__displayed[index] = text
+        if selected:
+            self.__listbox.selection_set(index)
+    
+    def __apply_display_diff(self, new_strings: tuple[str]):
+        '''
+        Updates the listbox to show new_strings with as few Tcl calls as possible.
+        Only the rows between the common start and end of the old and new list are touched,
+        selection and scroll position are kept for rows outside of that range
+        
+        Args:
+            new_strings(tuple[str]): the full list of display strings that should be shown
+        '''
+        old_strings: list[str] = self.__displayed
+        old_len: int = len(old_strings)
+        new_len: int = len(new_strings)
+        
+        # skipping rows that are the same at the start...
+        start: int = 0
+        while start < old_len and start < new_len and old_strings[start] == new_strings[start]:
+            start += 1
+        if start == old_len == new_len:
+            return # nothing changed
+        # ...and at the end
+        old_end: int = old_len
+        new_end: int = new_len
+        while old_end > start and new_end > start and old_strings[old_end - 1] == new_strings[new_end - 1]:
+            old_end -= 1
+            new_end -= 1
+        
+        top: int = self.__listbox.nearest(0) # first visible row
+        selection: tuple[int] = self.__listbox.curselection()
+        shift: int = new_len - old_len # how much the rows after the changed range move
+        
+        if old_end - start == new_end - start:
+            # same amount of rows, only replacing the ones that differ
+            for index in range(start, old_end):
+                if old_strings[index] != new_strings[index]:
+                    self.__replace_row(index, new_strings[index])
+            return
+        
+        if start == 0 and old_end == old_len:
+            self.__listbox.delete(0, tk.END)# nothing to keep, full rebuild with a single insert call
+        elif old_end > start:
+            self.__listbox.delete(start, old_end - 1)
+        if new_end > start:
+            self.__listbox.insert(start, *new_strings[start:new_end])
+        self.__displayed = list(new_strings)
+        
+        # restoring selection and scroll for rows that survived
+        self.__listbox.selection_clear(0, tk.END)
+        for index in selection:
+            if index < start:
+                self.__listbox.selection_set(index)
+            elif index >= old_end:
+                self.__listbox.selection_set(index + shift)
+        self.__listbox.yview(top if top < start else max(top + shift, start))
+        
+    def __add_todo(self):
+        def show_add_windows():
+            def on_save():
+                '''
+                Called when we want to save the info the the add box
+                '''
+                if not ToDoLogic.is_valid_title(title_var.get()):# making sure title is not too long
+                    self.error_msgbox(f"Title lenght has to be between 1 and {ToDoLogic.TITLE_MAX_LENGTH}")
+                    return
+                
+                self.__on_new_entry(MappingProxyType({"title": title_var.get(), #Getting text from box var
+                                                      "info": info_var.get(), #Getting text from box var
+                                                      "date": int(datetime.now().timestamp()), #Time when the task was created, unix epoch
+                                                      "is_done": False} #defaul ToDo is NOT done
+                                                     )
+                                    ) 
+                add_task_widnow.destroy()#data submited so we are destoying the windows
+             
+                
+            add_task_widnow: Toplevel = Toplevel(self)
+            add_task_widnow.title("New ToDo!")
+            
+            #add task window and possitions it relative to root(main) window
+            add_task_widnow.geometry('%dx%d+%d+%d' % (self.DEFAULT_CONGIFS["add_box_w"], 
+                                                      self.DEFAULT_CONGIFS["add_box_h"], 
+                                                      self.winfo_x() + self.DEFAULT_CONGIFS["root_w"] - (self.DEFAULT_CONGIFS["add_box_w"]*1.5), 
+                                                      self.winfo_y() + self.DEFAULT_CONGIFS["root_h"]/2 - (self.DEFAULT_CONGIFS["add_box_h"])
+                                                      )
+                                     )
+            
+            add_task_widnow.attributes('-topmost', True)#make it alwasy on top
+            #add_task_widnow.config(bg=ToDoGUI.DEFAULT_CONGIFS["main_colour"]) 
+            
+            # add_task_widnow.grab_set()#lock all other window interactions
+            
+            # #var to store the text in title
+            # title_var: tk.StringVar = tk.StringVar(add_task_widnow)
+            # title = tk.Entry(add_task_widnow, textvariable = title_var)
+            # title.pack()
+            
+            # #var to store the text in info
+            # info_var: tk.StringVar = tk.StringVar(add_task_widnow)
+            # info = tk.Entry(add_task_widnow, textvariable = info_var)
+            # info.pack()
+
+            add_task_widnow.resizable(False, False) #making window NOT resizible W and H
+            
+            title_label = tk.Label(add_task_widnow, text="Title:")
+            title_label.grid(row=0, column=0)
+
+            #var to store the text in title
+            title_var: tk.StringVar = tk.StringVar(add_task_widnow)
+            title_entry = tk.Entry(add_task_widnow, textvariable = title_var, width=25)
+            title_entry.grid(row=0, column=1)
+
+            info_label = tk.Label(add_task_widnow, text="Info:")
+            info_label.grid(row=1, column=0)
+
+            #var to store the text in info
+            info_var: tk.StringVar = tk.StringVar(add_task_widnow)
+            info_text = tk.Entry(add_task_widnow, textvariable = info_var, width=25)
+            info_text.grid(row=1, column=1)
+
+            save_button = tk.Button(add_task_widnow, text="Save", command=on_save)
+            save_button.grid(row=2, column=1)
+
+            cancel_button = tk.Button(add_task_widnow, text="Cancel", command=add_task_widnow.destroy)
+            cancel_button.grid(row=3, column=1)
+
+
+  
+        show_add_windows()#creates/displays the add window
+        
+        
+    def refresh(self):
+        '''
+        Reloads the list from the database, picks up changes made outside of this window
+        '''
+        self.__logic.update_entry_list()
+        
+    def start(self):
+        self.refresh()# gets the innitial list
+        try:
+            self.mainloop()
+        finally:
+            self.__logic.close()# window closed, releasing the database connection
@@ -0,0 +1,253 @@
+'''
+Opt-in instrumentation, counters and latency histograms recorded by DatabaseManager, ToDoLogic and ToDoGUI,
+plus cProfile/tracemalloc captures that can be switched on and off while the app runs.
+
+Nothing is recorded until enable() is called, the instrumented code only checks ACTIVE for None.
+
+    metrics = ToDoMetrics.enable()
+    metrics.start_dumping("metrics.json", 10) # snapshot every 10 seconds
+    ...
+    print(metrics.snapshot()["histograms"]["logic.update_entry_list"])
+'''
+import functools
+import json
+import os
+import threading
+import time
+from typing import Callable
+
+HISTOGRAM_BOUNDS_MS: tuple[float] = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000) # bucket upper bounds, last bucket is everything slower
+
+class Histogram():
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+        self.buckets: list[int] = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        for bucket, bound in enumerate(HISTOGRAM_BOUNDS_MS):
+            if value <= bound:
+                self.buckets[bucket] += 1
+                return
+        self.buckets[-1] += 1
+
+    def percentile(self, fraction: float) -> float:
+        '''
+        Args:
+            fraction(float): 0.5 for the median, 0.95 for p95..
+
+        Returns:
+            float: upper bound of the bucket the percentile falls in, max for the last bucket
+        '''
+        rank: float = self.count * fraction
+        seen: int = 0
+        for bucket, amount in enumerate(self.buckets):
+            seen += amount
+            if seen >= rank and amount > 0:
+                return HISTOGRAM_BOUNDS_MS[bucket] if bucket < len(HISTOGRAM_BOUNDS_MS) else self.max
+        return self.max
+
+    def summary(self) -> dict:
+        return {"count": self.count,
+                "mean_ms": round(self.total / self.count, 4) if self.count else 0.0,
+                "p50_ms": self.percentile(0.5),
+                "p95_ms": self.percentile(0.95),
+                "max_ms": round(self.max, 4),
+                "buckets": dict(zip([f"<={bound}" for bound in HISTOGRAM_BOUNDS_MS] + ["slower"], self.buckets))}
+
+class Metrics():
+    '''
+    Thread safe in-process counters and histograms, the database worker and the GUI thread both record
+    '''
+    def __init__(self):
+        self.__lock: threading.Lock = threading.Lock()
+        self.__counters: dict[str, int] = {}
+        self.__histograms: dict[str, Histogram] = {}
+        self.__started: float = time.time()
+        self.__dump_stop: threading.Event = None
+
+    def count(self, name: str, amount: int = 1):
+        with self.__lock:
+            self.__counters[name] = self.__counters.get(name, 0) + amount
+
+    def observe(self, name: str, value_ms: float):
+        with self.__lock:
+            histogram: Histogram = self.__histograms.get(name)
+            if histogram is None:
+                histogram = self.__histograms[name] = Histogram()
+            histogram.observe(value_ms)
+
+    def since(self, name: str, start: float):
+        '''
+        Records the time since start
+
+        Args:
+            name(str): histogram name
+            start(float): time.perf_counter() value from when the work started
+        '''
+        self.observe(name, (time.perf_counter() - start) * 1000)
+
+    def observe_statement(self, sql_statment: str, elapsed_ms: float, rows: int, commit_ms: float, successful: bool):
+        '''
+        Records one DatabaseManager querry
+
+        Args:
+            sql_statment(str): SQL text, bound values keep it constant so it works as the statements name
+            elapsed_ms(float): total time including lock waits and retries
+            rows(int): rows returned or affected
+            commit_ms(float): time spent committing, negative for reads
+            successful(bool): did it work in the end
+        '''
+        name: str = "sql " + " ".join(sql_statment.split())
+        with self.__lock:
+            for histogram_name, value in ((name, elapsed_ms), ("db.statement", elapsed_ms), ("db.commit", commit_ms)):
+                if value < 0:
+                    continue
+                histogram: Histogram = self.__histograms.get(histogram_name)
+                if histogram is None:
+                    histogram = self.__histograms[histogram_name] = Histogram()
+                histogram.observe(value)
+            self.__counters["db.rows"] = self.__counters.get("db.rows", 0) + rows
+            self.__counters[name + " rows"] = self.__counters.get(name + " rows", 0) + rows
+            if not successful:
+                self.__counters["db.errors"] = self.__counters.get("db.errors", 0) + 1
+
+    def snapshot(self) -> dict:
+        '''
+        Returns:
+            dict: counters and histogram summaries, ready for json
+        '''
+        with self.__lock:
+            return {"timestamp": time.time(),
+                    "uptime_s": round(time.time() - self.__started, 1),
+                    "counters": dict(self.__counters),
+                    "histograms": {name: histogram.summary() for name, histogram in self.__histograms.items()}}
+
+    def reset(self):
+        with self.__lock:
+            self.__counters.clear()
+            self.__histograms.clear()
+
+    def dump(self, path: str):
+        '''
+        Writes a snapshot as JSON, replacing the file in one step so readers never see half of it
+        '''
+        temp_path: str = path + ".tmp"
+        with open(temp_path, "w") as file:
+            json.dump(self.snapshot(), file, indent=2)
+        os.replace(temp_path, path)
+
+    def start_dumping(self, path: str, interval_s: float = 10):
+        '''
+        Dumps a snapshot to path every interval_s seconds from a background thread, until stop_dumping
+
+        Args:
+            path(str): JSON file to write
+            interval_s(float): OPTIONAL seconds between dumps
+        '''
+        self.stop_dumping()
+        stop: threading.Event = threading.Event()
+        self.__dump_stop = stop
+
+        def run():
+            while not stop.wait(interval_s):
+                try:
+                    self.dump(path)
+                except OSError as ex:
+                    print(ex)
+        threading.Thread(target=run, daemon=True).start()
+
+    def stop_dumping(self):
+        if self.__dump_stop is not None:
+            self.__dump_stop.set()
+            self.__dump_stop = None
+
+ACTIVE: Metrics = None # installed recorder, None = instrumentation off
+
+def enable() -> Metrics:
+    '''
+    Turns instrumentation on, keeps the already recorded data if it was on
+
+    Returns:
+        Metrics: the active recorder
+    '''
+    global ACTIVE
+    if ACTIVE is None:
+        ACTIVE = Metrics()
+    return ACTIVE
+
+def disable():
+    global ACTIVE
+    if ACTIVE is not None:
+        ACTIVE.stop_dumping()
+    ACTIVE = None
+
+_profiler = None # running cProfile.Profile
+
+def toggle_profiling(path: str = "ToDoProfile.prof") -> bool:
+    '''
+    Starts a cProfile capture of the calling thread, or stops the running one and saves it for pstats/snakeviz
+
+    Args:
+        path(str): OPTIONAL where the stats go when stopping
+
+    Returns:
+        bool: is a capture running now
+    '''
+    global _profiler
+    if _profiler is None:
+        import cProfile # only loaded when someone profiles
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+        return True
+    _profiler.disable()
+    _profiler.dump_stats(path)
+    _profiler = None
+    return False
+
+def toggle_memory_tracing(path: str = "ToDoMemory.txt", limit: int = 25) -> bool:
+    '''
+    Starts tracemalloc, or stops it and writes the lines that allocated the most memory still in use
+
+    Args:
+        path(str): OPTIONAL report file written when stopping
+        limit(int): OPTIONAL lines in the report
+
+    Returns:
+        bool: is tracing running now
+    '''
+    import tracemalloc
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+        return True
+    current, peak = tracemalloc.get_traced_memory()
+    statistics = tracemalloc.take_snapshot().statistics("lineno")
+    tracemalloc.stop()
+    with open(path, "w") as file:
+        file.write(f"current {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB\n")
+        file.writelines(f"{stat}\n" for stat in statistics[:limit])
+    return False
+
+def timed(name: str) -> Callable:
+    '''
+    Decorator recording how long every call takes while instrumentation is on
+    '''
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            metrics: Metrics = ACTIVE
+            if metrics is None:
+                return func(*args, **kwargs)
+            start: float = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metrics.since(name, start)
+        return wrapper
+    return decorator
@@ -0,0 +1,284 @@
+'''
+Statistics over the whole database, for the report window and the CLI report command.
+
+Everything SQLite can count is a GROUP BY querry: completion per day/week, backlog age buckets and the
+longest open entries. Text analysis of titles and info can't be done in SQL, on big tables it is split
+into _ID ranges that a process pool works through, each process reading its range with its own connection.
+Reports are cached keyed on the table revision(and the day, ages change without writes), so asking again
+without changes costs one querry.
+
+    report = ToDoReport.build_report(period=ToDoReport.PERIOD_WEEK, days=90)[1]
+    print(ToDoReport.format_report(report))
+'''
+import json
+import math
+import multiprocessing
+import os
+import re
+import sqlite3
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+
+from ToDoCore import DatabaseManager
+
+PERIOD_DAY: str = "day"
+PERIOD_WEEK: str = "week"
+PERIOD_FORMATS: dict[str, str] = {PERIOD_DAY: "%Y-%m-%d", PERIOD_WEEK: "%Y-W%W"} # strftime bucket of each period
+AGE_BUCKETS: tuple[tuple[str, int]] = (("< 1 day", 1), ("1-7 days", 7), ("7-30 days", 30), ("30-90 days", 90), ("90+ days", None)) # label, up to days
+PARALLEL_MIN_ROWS: int = 50000 # smaller tables are analysed in this process, starting the pool costs more
+RANGES_PER_WORKER: int = 4 # smaller ranges even out workers that got the long notes
+WORD_PATTERN: re.Pattern = re.compile(r"\w{3,}")
+STOP_WORDS: frozenset = frozenset(("the", "and", "for", "with", "that", "this", "from", "are", "was", "have",
+                                   "not", "but", "you", "all", "can", "will", "has", "its", "into", "out"))
+
+_cache: dict[tuple, tuple[tuple, dict]] = {} # (database path, report arguments) -> (cache key, report)
+
+def count_words(path: str, table: str, after_id: int, last_id: int) -> tuple[Counter, int, int, int, int]:
+    '''
+    Text statistics of one _ID range, runs in a pool process so it opens its own connection
+
+    Args:
+        path(str): database file
+        table(str): entries table
+        after_id(int): range start, not included
+        last_id(int): range end, included
+
+    Returns:
+        tuple(Counter, int, int, int, int): word counts, entries, title characters, info characters, entries with info
+    '''
+    words: Counter = Counter()
+    entries: int = 0
+    title_chars: int = 0
+    info_chars: int = 0
+    with_info: int = 0
+    conn: sqlite3.Connection = sqlite3.connect(path, timeout=DatabaseManager.CONNECTION_TIMEOUT)
+    try:
+        cursor: sqlite3.Cursor = conn.execute(f"SELECT title, info FROM {table} WHERE _ID > ? AND _ID <= ?;", (after_id, last_id))
+        while True:
+            rows: list = cursor.fetchmany(1000)
+            if not rows:
+                break
+            for title, info in rows:
+                entries += 1
+                title_chars += len(title)
+                if info:
+                    info_chars += len(info)
+                    with_info += 1
+                words.update(word for word in WORD_PATTERN.findall(f"{title} {info or ''}".lower()) if word not in STOP_WORDS)
+    finally:
+        conn.close()
+    return words, entries, title_chars, info_chars, with_info
+
+def analyse_text(top: int = 10, workers: int = None) -> dict:
+    '''
+    Most used words and note lengths over every entry. Tables with PARALLEL_MIN_ROWS or more
+    are split into _ID ranges for a process pool, raises sqlite3.Error when a range cant be read
+
+    Args:
+        top(int): OPTIONAL how many words to keep
+        workers(int): OPTIONAL pool processes, DEFAULT one per CPU
+
+    Returns:
+        dict: words, entries, average title and info length, share of entries with info
+    '''
+    successful, rows = DatabaseManager.execure_sql_querry(f"SELECT IFNULL(MIN(_ID), 0), IFNULL(MAX(_ID), 0), COUNT(*) FROM {DatabaseManager.MAIN_TABLE};")
+    if not successful:
+        raise sqlite3.Error("cant read the _ID range")
+    first_id, last_id, count = rows[0]
+    path: str = DatabaseManager.DATABASE_PATH
+    table: str = DatabaseManager.MAIN_TABLE
+    if count < PARALLEL_MIN_ROWS or workers == 1:
+        parts: list[tuple] = [count_words(path, table, first_id - 1, last_id)]
+    else:
+        workers = workers or os.cpu_count() or 1
+        step: int = math.ceil((last_id - first_id + 1) / (workers * RANGES_PER_WORKER))
+        starts: range = range(first_id - 1, last_id, step)
+        # spawn, forking a process that has Tk and database threads running isnt safe
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            parts = list(pool.map(count_words,
+                                  [path] * len(starts),
+                                  [table] * len(starts),
+                                  starts,
+                                  [min(start + step, last_id) for start in starts]))
+    words: Counter = Counter()
+    entries = title_chars = info_chars = with_info = 0
+    for part_words, part_entries, part_title_chars, part_info_chars, part_with_info in parts:
+        words.update(part_words)
+        entries += part_entries
+        title_chars += part_title_chars
+        info_chars += part_info_chars
+        with_info += part_with_info
+    return {"words": words.most_common(top),
+            "entries": entries,
+            "avg_title_length": round(title_chars / entries, 1) if entries else 0.0,
+            "avg_info_length": round(info_chars / with_info, 1) if with_info else 0.0,
+            "with_info": round(with_info / entries, 3) if entries else 0.0}
+
+def completion(period: str = PERIOD_DAY, since: int = 0) -> tuple[bool, list]:
+    '''
+    Entries created and completed per day or week, archived entries included
+
+    Args:
+        period(str): OPTIONAL PERIOD_DAY or PERIOD_WEEK
+        since(int): OPTIONAL only periods from this unix epoch time on
+
+    Returns:
+        tuple(bool, list)
+            bool: was the querry sucsesfull
+            list: dicts with period, created, done(of the created ones), rate and completed(marked done in that period)
+    '''
+    bucket_format: str = PERIOD_FORMATS[period]
+    every_entry: str = f"SELECT date, is_done, done_at FROM {DatabaseManager.MAIN_TABLE} UNION ALL SELECT date, is_done, done_at FROM {DatabaseManager.MAIN_TABLE}Archive"
+    successful, created = DatabaseManager.execure_sql_querry(
+        f'''SELECT strftime(?, date, 'unixepoch', 'localtime') AS period, COUNT(*), SUM(is_done)
+            FROM ({every_entry}) WHERE date >= ? GROUP BY period;''', values=(bucket_format, since))
+    if not successful:
+        return False, []
+    successful, completed = DatabaseManager.execure_sql_querry(
+        f'''SELECT strftime(?, done_at, 'unixepoch', 'localtime') AS period, COUNT(*)
+            FROM ({every_entry}) WHERE is_done AND done_at >= ? GROUP BY period;''', values=(bucket_format, since))
+    if not successful:
+        return False, []
+    periods: dict[str, dict] = {}
+    for period_name, created_count, done_count in created:
+        periods[period_name] = {"period": period_name, "created": created_count, "done": done_count or 0,
+                                "rate": round((done_count or 0) / created_count, 3), "completed": 0}
+    for period_name, completed_count in completed:
+        periods.setdefault(period_name, {"period": period_name, "created": 0, "done": 0, "rate": 0.0, "completed": 0})["completed"] = completed_count
+    return True, [periods[period_name] for period_name in sorted(periods)]
+
+def backlog_age(now: int) -> tuple[bool, list]:
+    '''
+    How long the open entries have been open, counted in AGE_BUCKETS
+
+    Args:
+        now(int): unix epoch time ages are counted to
+
+    Returns:
+        tuple(bool, list)
+            bool: was the querry sucsesfull
+            list: (label, entries) for every bucket, empty ones included
+    '''
+    cases: list[str] = []
+    values: list[int] = []
+    for bucket, (label, days) in enumerate(AGE_BUCKETS):
+        if days is not None:
+            cases.append(f"WHEN date > ? THEN {bucket}")
+            values.append(now - days * 24 * 60 * 60)
+    successful, rows = DatabaseManager.execure_sql_querry(
+        f'''SELECT CASE {' '.join(cases)} ELSE {len(AGE_BUCKETS) - 1} END AS bucket, COUNT(*)
+            FROM {DatabaseManager.MAIN_TABLE} WHERE is_done = 0 GROUP BY bucket;''', values=tuple(values))
+    if not successful:
+        return False, []
+    counts: dict[int, int] = dict(rows)
+    return True, [(label, counts.get(bucket, 0)) for bucket, (label, days) in enumerate(AGE_BUCKETS)]
+
+def longest_open(now: int, limit: int = 10) -> tuple[bool, list]:
+    '''
+    Args:
+        now(int): unix epoch time ages are counted to
+        limit(int): OPTIONAL max amount of entries
+
+    Returns:
+        tuple(bool, list)
+            bool: was the querry sucsesfull
+            list: (_ID, title, days open) oldest first
+    '''
+    successful, rows = DatabaseManager.execure_sql_querry(
+        f"SELECT _ID, title, date FROM {DatabaseManager.MAIN_TABLE} WHERE is_done = 0 ORDER BY date, _ID LIMIT ?;", values=(limit,))
+    if not successful:
+        return False, []
+    return True, [(id, title, (now - created) // (24 * 60 * 60)) for id, title, created in rows]
+
+def build_report(period: str = PERIOD_DAY, days: int = 30, top: int = 10, workers: int = None, cache_path: str = None) -> tuple[bool, dict]:
+    '''
+    Builds the whole report, or returns the cached one if the table didnt change since
+
+    Args:
+        period(str): OPTIONAL PERIOD_DAY or PERIOD_WEEK completion buckets
+        days(int): OPTIONAL completion for this many days back, 0 = all of it
+        top(int): OPTIONAL longest open entries and most used words to list
+        workers(int): OPTIONAL text analysis processes, DEFAULT one per CPU
+        cache_path(str): OPTIONAL JSON file keeping the last report between runs, DEFAULT only cached in memory
+
+    Returns:
+        tuple(bool, dict)
+            bool: was the report built
+            dict: the report, ready for json and format_report
+    '''
+    successful, revision = DatabaseManager.get_revision() # read first, changes while building make the next call rebuild
+    if not successful:
+        return False, {}
+    arguments: tuple = (DatabaseManager.DATABASE_PATH, period, days, top)
+    key: list = [revision, date.today().isoformat()]
+    cached = _cache.get(arguments)
+    if cached is None and cache_path is not None and os.path.exists(cache_path):
+        try:
+            with open(cache_path) as file:
+                stored: dict = json.load(file)
+            cached = (stored["key"], stored["report"]) if tuple(stored["arguments"]) == arguments else None
+        except (OSError, ValueError, KeyError) as ex:
+            print(ex)
+    if cached is not None and cached[0] == key:
+        return True, cached[1]
+
+    now: int = int(time.time())
+    successful, totals = DatabaseManager.execure_sql_querry(
+        f'''SELECT COUNT(*), IFNULL(SUM(is_done), 0), (SELECT COUNT(*) FROM {DatabaseManager.MAIN_TABLE}Archive)
+            FROM {DatabaseManager.MAIN_TABLE};''')
+    if not successful:
+        return False, {}
+    completion_successful, completion_rows = completion(period, now - days * 24 * 60 * 60 if days > 0 else 0)
+    age_successful, age_rows = backlog_age(now)
+    open_successful, open_rows = longest_open(now, top)
+    if not (completion_successful and age_successful and open_successful):
+        return False, {}
+    try:
+        text: dict = analyse_text(top, workers)
+    except (sqlite3.Error, OSError, BrokenProcessPool) as ex:
+        print(ex)
+        return False, {}
+    entries, done, archived = totals[0]
+    report: dict = {"created_at": now,
+                    "revision": revision,
+                    "period": period,
+                    "totals": {"entries": entries, "done": done, "open": entries - done, "archived": archived},
+                    "completion": completion_rows,
+                    "backlog_age": age_rows,
+                    "longest_open": open_rows,
+                    "text": text}
+    _cache[arguments] = (key, report)
+    if cache_path is not None:
+        try:
+            with open(cache_path, "w") as file:
+                json.dump({"arguments": arguments, "key": key, "report": report}, file)
+        except OSError as ex:
+            print(ex)
+    return True, report
+
+def format_report(report: dict) -> str:
+    '''
+    Args:
+        report(dict): build_report result
+
+    Returns:
+        str: the report as plain text, for the terminal and the report window
+    '''
+    totals: dict = report["totals"]
+    lines: list[str] = [f"{totals['entries']} entries, {totals['open']} open, {totals['done']} done, {totals['archived']} archived",
+                        "",
+                        f"Per {report['period']}:          created  done  rate  completed"]
+    lines.extend(f"  {row['period']:<16}{row['created']:>8}{row['done']:>6}{row['rate']:>6.0%}{row['completed']:>11}"
+                 for row in report["completion"])
+    lines.extend(("", "Open for:"))
+    lines.extend(f"  {label:<16}{count:>8}" for label, count in report["backlog_age"])
+    lines.extend(("", "Longest open:"))
+    lines.extend(f"  {id:>6}  {title:<20} {days_open} days" for id, title, days_open in report["longest_open"])
+    text: dict = report["text"]
+    lines.extend(("", f"Titles {text['avg_title_length']} characters on average, "
+                      f"{text['with_info']:.0%} have info({text['avg_info_length']} characters on average)",
+                  "Most used words: " + ", ".join(f"{word}({count})" for word, count in text["words"])))
+    return "\n".join(lines)
@@ -0,0 +1,438 @@
+'''
+Local sync server so several ToDoList windows on one machine can share one database.
+
+There is no authentication, anyone who can connect can read every entry and delete or archive them.
+Only listen on 127.0.0.1 or a unix socket, reach it from other machines through something that
+checks who is connecting(an ssh tunnel for example), never bind it to 0.0.0.0 or a LAN address.
+
+The server owns the database, every querry runs on its single database thread in the order it arrived.
+Clients talk newline delimited JSON over TCP or a unix socket:
+
+    request   {"id": 1, "op": "set_done_status", "args": [[4, 7], true]}
+    request   {"id": 2, "op": "get_view", "args": [], "kwargs": {"order": "date", "limit": 100}}
+    response  {"id": 1, "ok": true, "result": true}
+    hello     {"event": "hello", "rev": 12}                                   sent once after connecting
+    change    {"event": "change", "rev": 13, "change": "update", "rows": [...]}  sent to every client after each write
+    change    {"event": "change", "rev": 14, "change": "delete", "ids": [4, 7]}
+
+rev counts writes, a client that sees a gap in it(it was disconnected) reloads instead of applying deltas.
+RemoteDatabase has the same querry methods as DatabaseManager, so ToDoLogic works on top of it unchanged.
+
+    python ToDoList.py serve --address 127.0.0.1:8765
+    python ToDoList.py gui --server 127.0.0.1:8765
+'''
+import asyncio
+import ipaddress
+import itertools
+import json
+import os
+import re
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Callable
+
+from ToDoCore import DatabaseManager, ToDoLogic
+
+DEFAULT_ADDRESS: str = "127.0.0.1:8765" # only local connections, the server has no authentication so keep it that way
+LINE_LIMIT: int = 64 * 1024 * 1024 # longest request line, bulk writes carrying info text are way over asyncios 64 KiB default
+REQUEST_ID: re.Pattern = re.compile(rb'\s*\{"id":\s*(\d+)') # id at the start of a request line, encode keeps it first
+ENTRY_COLUMNS: frozenset = frozenset(("title", "info", "date", "is_done")) # keys a client may insert, they end up in SQL
+
+# DatabaseManager methods clients may call, anything else is refused
+READ_OPERATIONS: frozenset = frozenset(("verify_db", "get_entries", "get_entries_after", "get_entries_before",
+                                        "get_view", "get_entries_by_id", "get_info", "get_done_ids", "search", 
+                                        "get_archived"))
+WRITE_OPERATIONS: frozenset = frozenset(("add_entry", "add_entries", "delete_entry", "delete_entries",
+                                         "reinsert_entries", "change_done_status", "set_done_status", "purge_done",
+                                         "archive_done", "restore_archived"))
+
+# what RemoteDatabase returns when the server cant be reached, shaped like DatabaseManagers failures
+FAILED_RESULTS: MappingProxyType = MappingProxyType({
+    "add_entry": (False, 0),
+    "add_entries": (False, []),
+    "get_entries": (False, []),
+    "get_entries_after": (False, []),
+    "get_entries_before": (False, []),
+    "get_view": (False, []),
+    "get_entries_by_id": (False, []),
+    "get_info": (False, []),
+    "get_done_ids": (False, []),
+    "search": (False, []),
+    "get_archived": (False, []),
+    "archive_done": (False, []),
+    "restore_archived": (False, []),
+    "reinsert_entries": (False, []),
+}) # every other operation returns a plain bool
+
+def parse_address(address: str) -> tuple:
+    '''
+    Args:
+        address(str): "host:port" or "unix:/path/to/socket"
+
+    Returns:
+        tuple: (socket family, address to bind/connect)
+    '''
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+def is_local_address(address: str) -> bool:
+    '''
+    Args:
+        address(str): "host:port" or "unix:/path/to/socket"
+
+    Returns:
+        bool: can only this machine connect to it, loopback or a unix socket
+    '''
+    family, address = parse_address(address)
+    if family == socket.AF_UNIX:
+        return True
+    if address[0] == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(address[0]).is_loopback
+    except ValueError:# a host name, it could resolve to anything
+        return False
+
+def encode(message: dict) -> bytes:
+    '''
+    One protocol line, MappingProxyTypes become objects and other iterables(generators) become arrays
+    '''
+    def default(value):
+        if isinstance(value, MappingProxyType):
+            return dict(value)
+        return list(value)
+    return json.dumps(message, default=default, separators=(",", ":")).encode() + b"\n"
+
+def clean_entry(val: dict) -> dict:
+    '''
+    Drops keys that arent entry columns, add_entry puts the keys straight into the INSERT
+    '''
+    return {key: value for key, value in val.items() if key in ENTRY_COLUMNS}
+
+class ToDoServer():
+    def __init__(self, address: str = DEFAULT_ADDRESS):
+        '''
+        Args:
+            address(str): OPTIONAL "host:port" or "unix:/path", port 0 picks a free port, see get_address
+        '''
+        self.__address: str = address
+        self.__rev: int = 0 # writes since the server started, only touched on the database thread
+        self.__writers: set[asyncio.StreamWriter] = set()
+        self.__loop: asyncio.AbstractEventLoop = None
+        self.__stopped: asyncio.Event = None
+        self.__ready: threading.Event = threading.Event()
+        # one thread so querries run one at a time in arrival order, and rev matches the order of the writes
+        self.__database: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=1, initializer=DatabaseManager.open_connection)
+
+    def get_address(self) -> str:
+        '''
+        Waits until the server is listening
+
+        Returns:
+            str: address clients can connect to, with the real port when it was started on port 0
+        '''
+        self.__ready.wait()
+        return self.__address
+
+    def run(self):
+        '''
+        Serves until stop() is called, blocking
+        '''
+        asyncio.run(self.__serve())
+
+    def stop(self):
+        '''
+        Stops a running server, can be called from any thread
+        '''
+        self.__ready.wait()
+        self.__loop.call_soon_threadsafe(self.__stopped.set)
+
+    async def __serve(self):
+        self.__loop = asyncio.get_running_loop()
+        self.__stopped = asyncio.Event()
+        if not await self.__loop.run_in_executor(self.__database, DatabaseManager.verify_db):
+            self.__ready.set()
+            raise RuntimeError("Database Verification Issue")
+        family, address = parse_address(self.__address)
+        if family == socket.AF_UNIX:
+            if os.path.exists(address):# left over from a server that didnt shut down cleanly
+                os.remove(address)
+            server: asyncio.AbstractServer = await asyncio.start_unix_server(self.__handle_client, address, limit=LINE_LIMIT)
+        else:
+            server = await asyncio.start_server(self.__handle_client, *address, limit=LINE_LIMIT)
+            self.__address = "%s:%d" % server.sockets[0].getsockname()[:2]
+        self.__ready.set()
+        try:
+            async with server:
+                await self.__stopped.wait()
+        finally:
+            for writer in tuple(self.__writers):
+                writer.close()
+            await self.__loop.run_in_executor(self.__database, DatabaseManager.close_connection)
+            self.__database.shutdown()
+            if family == socket.AF_UNIX and os.path.exists(address):
+                os.remove(address)
+
+    async def __handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # joining through the database thread, so the hello rev and the first change event sent line up
+        await self.__loop.run_in_executor(self.__database, lambda: self.__loop.call_soon_threadsafe(self.__welcome, writer, self.__rev))
+        try:
+            while True:
+                try:
+                    line: bytes = await reader.readuntil(b"\n")
+                except asyncio.IncompleteReadError as ex:# closed, maybe after a last line without a newline
+                    if not ex.partial.strip():
+                        break
+                    line = ex.partial
+                except (asyncio.LimitOverrunError, ValueError) as ex:
+                    # answering the request as failed instead of dropping the connection, its caller would wait for nothing
+                    head: bytes = await self.__discard_line(reader, ex.consumed) if isinstance(ex, asyncio.LimitOverrunError) else b""
+                    match: re.Match = REQUEST_ID.match(head)
+                    writer.write(encode({"id": int(match[1]) if match else None, "ok": False, "error": f"request longer than {LINE_LIMIT} bytes"}))
+                    await writer.drain()
+                    continue
+                request: dict = None
+                try:
+                    request = json.loads(line)
+                    op: str = request["op"]
+                    args: list = request.get("args", [])
+                    kwargs: dict = request.get("kwargs", {})
+                    if op not in READ_OPERATIONS and op not in WRITE_OPERATIONS:
+                        raise ValueError(f"unknown operation {op!r}")
+                    result = await self.__loop.run_in_executor(self.__database, self.__execute, op, args, kwargs)
+                    response: dict = {"id": request["id"], "ok": True, "result": result}
+                except Exception as ex:
+                    response = {"id": request.get("id") if isinstance(request, dict) else None, "ok": False, "error": str(ex)}
+                writer.write(encode(response))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.__writers.discard(writer)
+            writer.close()
+
+    async def __discard_line(self, reader: asyncio.StreamReader, consumed: int) -> bytes:
+        '''
+        Skips a request line longer than LINE_LIMIT without holding all of it
+
+        Args:
+            reader(asyncio.StreamReader): client stream, positioned at the start of the line
+            consumed(int): bytes of the line already buffered, from the LimitOverrunError
+
+        Returns:
+            bytes: the start of the line, for the request id
+        '''
+        head: bytes = await reader.readexactly(consumed)
+        while True:
+            try:
+                await reader.readuntil(b"\n")
+                return head
+            except asyncio.LimitOverrunError as ex:
+                await reader.readexactly(ex.consumed)
+
+    def __execute(self, op: str, args: list, kwargs: dict):
+        '''
+        Runs one operation on the database thread, writes get their change event queued for every client
+        '''
+        if op == "add_entry":
+            args = [clean_entry(args[0])]
+        elif op == "add_entries":
+            args = [map(clean_entry, args[0])] + args[1:]
+        if op not in WRITE_OPERATIONS:
+            return getattr(DatabaseManager, op)(*args, **kwargs)
+        if kwargs:
+            raise ValueError(f"{op} only takes positional arguments") # the change events are built from args
+
+        done_ids: list[int] = DatabaseManager.get_done_ids()[1] if op == "purge_done" else []
+        if op == "add_entries":
+            result = DatabaseManager.add_entries(args[0]) # always reading the rows back, they are the change
+            change: dict = {"change": ToDoLogic.CHANGE_INSERT, "rows": result[1]}
+            if len(args) > 1 and not args[1]:
+                result = (result[0], [])
+        else:
+            result = getattr(DatabaseManager, op)(*args)
+            change = self.__describe_change(op, args, result, done_ids)
+        if change is None:
+            return result
+        self.__rev += 1
+        change.update(event="change", rev=self.__rev)
+        self.__loop.call_soon_threadsafe(self.__broadcast, encode(change))
+        return result
+
+    def __describe_change(self, op: str, args: list, result, done_ids: list[int]) -> dict:
+        '''
+        Turns a write into the change event clients apply
+
+        Returns:
+            dict: change and the rows or ids it affected, None if nothing was written
+        '''
+        successful: bool = result[0] if isinstance(result, tuple) else result
+        if not successful and not (op == "archive_done" and result[1]):# batches before a failed one did move
+            return None
+        if op == "add_entry":
+            return {"change": ToDoLogic.CHANGE_INSERT, "rows": DatabaseManager.get_entries_by_id([result[1]])[1]}
+        if op == "change_done_status":
+            return {"change": ToDoLogic.CHANGE_UPDATE, "rows": DatabaseManager.get_entries_by_id([args[0]])[1]}
+        if op == "set_done_status":
+            return {"change": ToDoLogic.CHANGE_UPDATE, "rows": DatabaseManager.get_entries_by_id(args[0])[1]}
+        if op == "delete_entry":
+            return {"change": ToDoLogic.CHANGE_DELETE, "ids": [args[0]]}
+        if op == "delete_entries":
+            return {"change": ToDoLogic.CHANGE_DELETE, "ids": list(args[0])}
+        if op == "archive_done":
+            return {"change": ToDoLogic.CHANGE_DELETE, "ids": result[1]}
+        if op == "restore_archived":
+            return {"change": ToDoLogic.CHANGE_INSERT, "rows": result[1]}
+        if op == "reinsert_entries":
+            return {"change": ToDoLogic.CHANGE_INSERT, "rows": DatabaseManager.get_entries_by_id(result[1])[1]}
+        return {"change": ToDoLogic.CHANGE_DELETE, "ids": done_ids} # purge_done
+
+    def __welcome(self, writer: asyncio.StreamWriter, rev: int):
+        writer.write(encode({"event": "hello", "rev": rev}))
+        self.__writers.add(writer)
+
+    def __broadcast(self, line: bytes):
+        for writer in tuple(self.__writers):
+            writer.write(line)
+
+class RemoteDatabase():
+    '''
+    DatabaseManager lookalike that runs every querry on a ToDoServer.
+    Calls block until the server answered and are safe from any thread
+    '''
+    MAX_ID: int = DatabaseManager.MAX_ID
+    TIMEOUT: float = 30 # seconds to wait for an answer before the call counts as failed
+
+    def __init__(self, address: str = DEFAULT_ADDRESS):
+        '''
+        Args:
+            address(str): OPTIONAL "host:port" or "unix:/path" of the server
+        '''
+        self.__address: str = address
+        self.__socket: socket.socket = None
+        self.__send_lock: threading.Lock = threading.Lock() # also guards connecting
+        self.__request_ids = itertools.count(1)
+        self.__waiting: dict[int, list] = {} # request id -> [threading.Event, response]
+        self.__change_listener: Callable = None
+        self.__rev: int = None # rev of the last change seen, None before the first connection
+
+    def set_change_listener(self, listener: Callable):
+        '''
+        Args:
+            listener(Callable): called on the connections reader thread with (change, rows or ids) for every write
+                made by any client, (ToDoLogic.CHANGE_RELOAD, None) when changes were missed
+        '''
+        self.__change_listener = listener
+
+    def open_connection(self) -> bool:
+        '''
+        Connects to the server, does nothing when already connected
+
+        Returns:
+            bool: is it connected
+        '''
+        with self.__send_lock:
+            return self.__connect()
+
+    def close_connection(self):
+        with self.__send_lock:
+            if self.__socket is not None:
+                self.__socket.close()
+                self.__socket = None
+
+    def __connect(self) -> bool:
+        if self.__socket is not None:
+            return True
+        family, address = parse_address(self.__address)
+        connection: socket.socket = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            connection.connect(address)
+        except OSError as ex:
+            print(ex)
+            connection.close()
+            return False
+        if family == socket.AF_INET:
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1) # small requests, dont wait to batch them
+        self.__socket = connection
+        threading.Thread(target=self.__read, args=(connection,), daemon=True).start()
+        return True
+
+    def __read(self, connection: socket.socket):
+        '''
+        Reader thread, hands responses to the waiting calls and change events to the listener
+        '''
+        try:
+            for line in connection.makefile("rb"):
+                message: dict = json.loads(line)
+                if "event" in message:
+                    self.__on_event(message)
+                    continue
+                waiting: list = self.__waiting.get(message["id"])
+                if waiting is not None:
+                    waiting[1] = message
+                    waiting[0].set()
+        except (OSError, ValueError):
+            pass
+        with self.__send_lock:
+            if self.__socket is connection:# lost, next call reconnects
+                self.__socket = None
+        for waiting in tuple(self.__waiting.values()):
+            waiting[0].set() # no answer is coming, the calls fail instead of waiting for the timeout
+
+    def __on_event(self, message: dict):
+        rev: int = message["rev"]
+        if message["event"] == "hello":
+            missed: bool = self.__rev is not None and rev != self.__rev
+        else:
+            missed = self.__rev is not None and rev != self.__rev + 1
+        self.__rev = rev
+        if self.__change_listener is None:
+            return
+        if missed:
+            self.__change_listener(ToDoLogic.CHANGE_RELOAD, None)
+        if message["event"] == "change":
+            self.__change_listener(message["change"], message.get("rows", message.get("ids")))
+
+    def call(self, op: str, *args, **kwargs):
+        '''
+        Runs a DatabaseManager method on the server
+
+        Args:
+            op(str): method name
+            args, kwargs: its arguments
+
+        Returns:
+            the methods return value, its failure value if the server cant be reached
+        '''
+        request_id: int = next(self.__request_ids)
+        waiting: list = [threading.Event(), None]
+        self.__waiting[request_id] = waiting
+        try:
+            with self.__send_lock:
+                if not self.__connect():
+                    return FAILED_RESULTS.get(op, False)
+                self.__socket.sendall(encode({"id": request_id, "op": op, "args": args, "kwargs": kwargs}))
+            if not waiting[0].wait(RemoteDatabase.TIMEOUT) or waiting[1] is None:
+                print(f"No answer from {self.__address} for {op}")
+                return FAILED_RESULTS.get(op, False)
+        except OSError as ex:
+            print(ex)
+            return FAILED_RESULTS.get(op, False)
+        finally:
+            del self.__waiting[request_id]
+        response: dict = waiting[1]
+        if not response["ok"]:
+            print(response["error"])
+            return FAILED_RESULTS.get(op, False)
+        result = response["result"]
+        return tuple(result) if isinstance(result, list) else result
+
+    def __getattr__(self, name: str) -> Callable:
+        # querry methods, so a RemoteDatabase can be passed wherever DatabaseManager is used
+        if name not in READ_OPERATIONS and name not in WRITE_OPERATIONS:
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self.call(name, *args, **kwargs)
@@ -0,0 +1,171 @@
+'''
+Streaming import/export of entries as JSON lines or CSV.
+
+Both directions work in fixed size batches so memory stays flat no matter how big the file or table is.
+Progress is reported after every batch with the numbers needed to continue an interrupted run:
+export continues after the last exported _ID, import continues from a record number.
+'''
+import csv
+import json
+import sqlite3
+from datetime import datetime
+from types import MappingProxyType
+from typing import Callable, Iterable, Iterator, TextIO
+
+from ToDoCore import DatabaseManager, ToDoLogic
+
+FORMAT_JSONL: str = "jsonl"
+FORMAT_CSV: str = "csv"
+FIELDS: tuple[str] = ("id", "date", "title", "info", "is_done") # column order of DatabaseManager.ENTRY_COLUMNS
+BATCH_SIZE: int = 1000
+
+def guess_format(path: str) -> str:
+    '''
+    Args:
+        path(str): file name
+
+    Returns:
+        str: FORMAT_CSV for .csv files, FORMAT_JSONL otherwise
+    '''
+    return FORMAT_CSV if path.lower().endswith(".csv") else FORMAT_JSONL
+
+def export_entries(file: TextIO, file_format: str = FORMAT_JSONL, after_id: int = 0,
+                   batch_size: int = BATCH_SIZE, progress: Callable = None) -> tuple[bool, int]:
+    '''
+    Writes entries to file batch by batch, straight from a database cursor
+
+    Args:
+        file(TextIO): open text file, for CSV opened with newline=""
+        file_format(str): OPTIONAL FORMAT_JSONL or FORMAT_CSV
+        after_id(int): OPTIONAL only export entries with a bigger _ID, to continue an interrupted export.
+            The CSV header is only written when this is 0
+        batch_size(int): OPTIONAL rows per batch
+        progress(Callable): OPTIONAL called after every batch with (rows written so far, last exported _ID)
+
+    Returns:
+        tuple(bool, int)
+            bool: was the export sucsesfull
+            int: rows written
+    '''
+    writer = csv.writer(file) if file_format == FORMAT_CSV else None
+    if writer is not None and after_id == 0:
+        writer.writerow(FIELDS)
+    written: int = 0
+    try:
+        for rows in DatabaseManager.iter_entries(after_id, batch_size):
+            if writer is not None:
+                writer.writerows((row[0], row[1], row[2], row[3], int(bool(row[4]))) for row in rows)
+            else:
+                file.write("".join(json.dumps(dict(zip(FIELDS, row[:4]), is_done=bool(row[4]))) + "\n" for row in rows))
+            written += len(rows)
+            if progress is not None:
+                progress(written, rows[-1][0])
+    except sqlite3.Error as ex:
+        print(ex)
+        return False, written
+    return True, written
+
+def read_records(file: TextIO, file_format: str = FORMAT_JSONL) -> Iterator[dict]:
+    '''
+    Parses records one at a time, blank JSON lines are skipped
+
+    Args:
+        file(TextIO): open text file, for CSV opened with newline=""
+        file_format(str): OPTIONAL FORMAT_JSONL or FORMAT_CSV
+
+    Returns:
+        Iterator[dict]: one dict per record, {"error": message} for lines that arent valid JSON objects
+    '''
+    if file_format == FORMAT_CSV:
+        yield from csv.DictReader(file)
+        return
+    for line in file:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as ex:
+            record = {"error": f"invalid JSON, {ex}"}
+        yield record if isinstance(record, dict) else {"error": "not a JSON object"}
+
+def validate_record(record: dict) -> tuple[MappingProxyType, str]:
+    '''
+    Checks a record with the same rules as entries added in the GUI
+
+    Args:
+        record(dict): parsed record
+
+    Returns:
+        tuple(MappingProxyType, str)
+            MappingProxyType: entry ready for DatabaseManager.add_entries, None if the record is invalid
+            str: why the record is invalid, empty if its valid
+    '''
+    if "error" in record:
+        return None, record["error"]
+    title = record.get("title")
+    if not isinstance(title, str) or not ToDoLogic.is_valid_title(title):
+        return None, f"title lenght has to be between 1 and {ToDoLogic.TITLE_MAX_LENGTH}"
+    info = record.get("info") or ""
+    try:
+        date: int = int(record["date"]) if record.get("date") not in (None, "") else int(datetime.now().timestamp())
+    except (TypeError, ValueError):
+        return None, f"date has to be unix epoch seconds, got {record['date']!r}"
+    is_done = record.get("is_done", False)
+    if isinstance(is_done, str):# CSV values are always text
+        if is_done.strip().lower() not in ("", "0", "1", "true", "false"):
+            return None, f"is_done has to be true/false or 1/0, got {is_done!r}"
+        is_done = is_done.strip().lower() in ("1", "true")
+    return MappingProxyType({"title": title, "info": str(info), "date": date, "is_done": bool(is_done)}), ""
+
+def import_entries(file: TextIO, file_format: str = FORMAT_JSONL, start_record: int = 0, batch_size: int = BATCH_SIZE,
+                   dry_run: bool = False, progress: Callable = None, on_invalid: Callable = None) -> tuple[bool, int, int]:
+    '''
+    Adds entries from file, batch_size records per transaction.
+    Invalid records are reported and skipped, they dont stop the import
+
+    Args:
+        file(TextIO): open text file, for CSV opened with newline=""
+        file_format(str): OPTIONAL FORMAT_JSONL or FORMAT_CSV
+        start_record(int): OPTIONAL skip this many records, to continue an interrupted import
+        batch_size(int): OPTIONAL records per transaction
+        dry_run(bool): OPTIONAL only validate, nothing is written
+        progress(Callable): OPTIONAL called after every committed batch with (records done, entries written).
+            Records done is the start_record to pass to continue from there
+        on_invalid(Callable): OPTIONAL called with (record number, reason) for every invalid record
+
+    Returns:
+        tuple(bool, int, int)
+            bool: were all the batches written
+            int: entries written(or that would be written in a dry run)
+            int: invalid records
+    '''
+    written: int = 0
+    invalid: int = 0
+    batch: list[MappingProxyType] = []
+    record_number: int = 0
+
+    def flush() -> bool:
+        nonlocal written
+        if batch and not dry_run:
+            if not DatabaseManager.add_entries(batch, return_new=False)[0]:
+                return False
+        written += len(batch)
+        batch.clear()
+        if progress is not None:
+            progress(record_number, written)
+        return True
+
+    records: Iterable[dict] = read_records(file, file_format)
+    for record_number, record in enumerate(records, start=1):
+        if record_number <= start_record:
+            continue
+        entry, reason = validate_record(record)
+        if entry is None:
+            invalid += 1
+            if on_invalid is not None:
+                on_invalid(record_number, reason)
+            continue
+        batch.append(entry)
+        if len(batch) >= batch_size and not flush():
+            return False, written, invalid
+    return flush(), written, invalid
@@ -0,0 +1,418 @@
+'''
+Regression tests for DatabaseManager and ToDoLogic, against a temporary database.
+
+    python -m unittest test_ToDoCore
+'''
+import io
+import os
+import socket
+import sqlite3
+import tempfile
+import time
+import threading
+import unittest
+from contextlib import closing
+from datetime import datetime
+from types import MappingProxyType
+from unittest import mock
+
+from ToDoCore import DatabaseManager, ToDoLogic
+import ToDoCLI
+import ToDoServer
+
+class DatabaseTestCase(unittest.TestCase):
+    '''
+    Points DatabaseManager at a new database file for every test
+    '''
+    def setUp(self):
+        self.__directory = tempfile.TemporaryDirectory()
+        self.__old_path: str = DatabaseManager.DATABASE_PATH
+        DatabaseManager.close_connection()
+        DatabaseManager.DATABASE_PATH = os.path.join(self.__directory.name, "test.db")
+        self.assertTrue(DatabaseManager.verify_db())
+
+    def tearDown(self):
+        DatabaseManager.close_connection()
+        DatabaseManager.DATABASE_PATH = self.__old_path
+        self.__directory.cleanup()
+
+    def backdate_done(self):
+        '''
+        Makes every done entry done for a minute already, archiving with --days 0 only takes entries done before now
+        '''
+        self.assertTrue(DatabaseManager.execure_sql_querry(f"UPDATE {DatabaseManager.MAIN_TABLE} SET done_at = done_at - 60 WHERE is_done;", True)[0])
+
+    def cli(self, *argv: str) -> int:
+        return ToDoCLI.main(["--db", DatabaseManager.DATABASE_PATH, *argv])
+
+    def done_at(self, table: str = DatabaseManager.MAIN_TABLE) -> dict[str, int]:
+        return dict(DatabaseManager.execure_sql_querry(f"SELECT title, done_at FROM {table};")[1])
+
+class MigrationTest(DatabaseTestCase):
+    def old_database(self, version: int, script: str):
+        '''
+        Switches to a database file made by an older version, schema steps up to version plus script for its rows
+        '''
+        DatabaseManager.close_connection()
+        DatabaseManager.DATABASE_PATH = os.path.join(os.path.dirname(DatabaseManager.DATABASE_PATH), "old.db")
+        steps: str = " ".join(step.format(table=DatabaseManager.MAIN_TABLE) for step in DatabaseManager.SCHEMA_MIGRATIONS[:version])
+        with closing(sqlite3.connect(DatabaseManager.DATABASE_PATH)) as conn:
+            conn.executescript(f"BEGIN; {steps} PRAGMA user_version={version}; {script} COMMIT;")
+
+    def rows(self, table: str = DatabaseManager.MAIN_TABLE) -> list[tuple]:
+        return DatabaseManager.execure_sql_querry(f"SELECT _ID, date, title, info, is_done, done_at FROM {table} ORDER BY _ID;")[1]
+
+    def sequence(self) -> int:
+        return DatabaseManager.execure_sql_querry("SELECT seq FROM sqlite_sequence WHERE name = ?;", values=(DatabaseManager.MAIN_TABLE,))[1][0][0]
+
+    def test_baseline_text_dates(self):
+        # the original schema, created without a user_version, dates as sqlite3 adapted datetime into text
+        created: datetime = datetime(2024, 3, 5, 14, 30)
+        done: datetime = datetime(2024, 3, 6, 9, 15, 42, 123456)
+        self.old_database(0, f'''CREATE TABLE Entries(_ID INTEGER PRIMARY KEY NOT NULL,date TEXT NOT NULL, title TEXT NOT NULL,info TEXT,is_done BOOL NOT NULL);
+            INSERT INTO Entries VALUES (1, '{created}', 'Buy milk', '2 litres', 0);
+            INSERT INTO Entries VALUES (2, '{done}', 'Call the bank', NULL, 1);
+            INSERT INTO Entries VALUES (3, 'not a date', 'Water plants', '', 0);''')
+        before: int = int(time.time())
+        self.assertTrue(DatabaseManager.verify_db())
+        after: int = int(time.time())
+        rows: list[tuple] = self.rows()
+        self.assertEqual(rows[0], (1, int(created.timestamp()), "Buy milk", "2 litres", 0, None))
+        self.assertEqual(rows[1][:5], (2, int(done.timestamp()), "Call the bank", None, 1))
+        self.assertTrue(before <= rows[1][5] <= after) # done since the migration
+        self.assertEqual(rows[2][2:], ("Water plants", "", 0, None))
+        self.assertTrue(before <= rows[2][1] <= after) # unreadable dates get the migration time
+        self.assertEqual(DatabaseManager.execure_sql_querry("PRAGMA user_version;")[1][0][0], len(DatabaseManager.SCHEMA_MIGRATIONS))
+        self.assertEqual([row[0] for row in DatabaseManager.search("milk")[1]], [1])
+        self.assertEqual([row[0] for row in DatabaseManager.search("bank")[1]], [2])
+        self.assertEqual(self.sequence(), 3)
+        self.assertEqual(DatabaseManager.add_entry({"title": "new", "info": "", "date": 1, "is_done": False})[1], 4)
+
+    def test_version_6_with_a_clashing_archived_id(self):
+        # entry 3 was archived, then a new entry got _ID 3 again, and entry 2 was deleted
+        self.old_database(6, '''INSERT INTO Entries(_ID, date, title, info, is_done) VALUES (1, 1, 'one', '', 0), (2, 2, 'two', '', 0), (3, 3, 'old three', '', 1);
+            UPDATE Entries SET done_at = 100 WHERE _ID = 3;
+            INSERT INTO EntriesArchive SELECT _ID, date, title, info, is_done, done_at, 200 FROM Entries WHERE _ID = 3;
+            DELETE FROM Entries WHERE _ID = 3;
+            INSERT INTO Entries(date, title, info, is_done) VALUES (4, 'new three', 'notes', 1);
+            DELETE FROM Entries WHERE _ID = 2;''')
+        self.assertTrue(DatabaseManager.verify_db())
+        self.assertEqual([row[:3] for row in self.rows()], [(1, 1, "one"), (3, 4, "new three")])
+        self.assertEqual(self.rows(f"{DatabaseManager.MAIN_TABLE}Archive"), [(6, 3, "old three", "", 1, 100)]) # moved past every used _ID
+        self.assertEqual(self.sequence(), 6)
+        self.assertEqual([row[0] for row in DatabaseManager.search("three")[1]], [3])
+        self.assertEqual(DatabaseManager.get_info([3])[1][0][1], "notes")
+        self.assertEqual(DatabaseManager.add_entry({"title": "four", "info": "", "date": 5, "is_done": False})[1], 7)
+        DatabaseManager.execure_sql_querry(f"UPDATE {DatabaseManager.MAIN_TABLE} SET done_at = 100 WHERE _ID = 3;", True)
+        self.assertEqual(DatabaseManager.archive_done(60)[1], [3])
+        self.assertEqual([row[0] for row in DatabaseManager.restore_archived([6])[1]], [6])
+
+class ArchiveTest(DatabaseTestCase):
+    def test_archiving_after_the_highest_id_was_archived(self):
+        # the archived entry had the highest _ID, without AUTOINCREMENT "three" got it again and couldnt be archived
+        self.assertEqual(self.cli("add", "one"), 0)
+        self.assertEqual(self.cli("add", "two", "--done"), 0)
+        self.backdate_done()
+        self.assertEqual(self.cli("archive", "--days", "0"), 0)
+        self.assertEqual(self.cli("add", "three", "--done"), 0)
+        self.backdate_done()
+        self.assertEqual(self.cli("archive", "--days", "0"), 0)
+        successful, rows = DatabaseManager.get_archived()
+        self.assertTrue(successful)
+        self.assertEqual(sorted(row[2] for row in rows), ["three", "two"])
+        self.assertEqual(len({row[0] for row in rows}), 2)
+
+    def test_restore_keeps_done_at(self):
+        self.assertEqual(self.cli("add", "old", "--done"), 0)
+        DatabaseManager.execure_sql_querry(f"UPDATE {DatabaseManager.MAIN_TABLE} SET done_at = 1000;", True)
+        self.assertEqual(self.cli("archive", "--days", "1"), 0)
+        self.assertEqual(self.done_at(f"{DatabaseManager.MAIN_TABLE}Archive"), {"old": 1000})
+        self.assertTrue(DatabaseManager.restore_archived([1])[0])
+        self.assertEqual(self.done_at(), {"old": 1000})
+
+    def test_undone_delete_keeps_done_at(self):
+        logic: ToDoLogic = ToDoLogic(lambda change, indices: None, self.fail)
+        logic.add_new_entry(MappingProxyType({"title": "old", "info": "notes", "date": 1, "is_done": True}))
+        DatabaseManager.execure_sql_querry(f"UPDATE {DatabaseManager.MAIN_TABLE} SET done_at = 1000;", True)
+        logic.update_entry_list()
+        logic.remove_entry(0) # written right away without a scheduler
+        self.assertEqual(self.done_at(), {})
+        logic.undo()
+        self.assertEqual(self.done_at(), {"old": 1000})
+        self.assertEqual(DatabaseManager.get_info([1])[1], [(1, "notes", 1000)])
+        logic.close()
+
+class TombstoneTest(DatabaseTestCase):
+    def tombstones(self) -> int:
+        return DatabaseManager.execure_sql_querry(f"SELECT COUNT(*) FROM {DatabaseManager.MAIN_TABLE}_deleted;")[1][0][0]
+
+    def test_archiving_prunes_tombstones(self):
+        self.assertEqual(self.cli("add", "one", "--done"), 0)
+        self.assertEqual(self.cli("add", "two", "--done"), 0)
+        self.backdate_done()
+        with mock.patch.object(DatabaseManager, "TOMBSTONE_KEEP", 0):
+            self.assertEqual(self.cli("archive", "--days", "0"), 0)
+        self.assertEqual(self.tombstones(), 0)
+
+    def test_changes_since_a_pruned_revision(self):
+        self.assertTrue(DatabaseManager.add_entries([{"title": title, "info": "", "date": 1, "is_done": False} for title in "abc"])[0])
+        revision: int = DatabaseManager.get_revision()[1]
+        self.assertTrue(DatabaseManager.delete_entries([1]))
+        self.assertTrue(DatabaseManager.prune_tombstones(keep=1)) # the last delete is kept
+        self.assertEqual(DatabaseManager.get_changes_since(revision)[2:], ([], [1]))
+        self.assertTrue(DatabaseManager.delete_entries([2]))
+        self.assertTrue(DatabaseManager.prune_tombstones(keep=0))
+        self.assertEqual(self.tombstones(), 0)
+        self.assertEqual(DatabaseManager.get_changes_since(revision), (True, revision + 2, None, None))
+
+    def test_watch_reloads_when_it_is_behind_the_pruned_tombstones(self):
+        self.assertTrue(DatabaseManager.add_entries([{"title": title, "info": "", "date": 1, "is_done": False} for title in "ab"])[0])
+        logic: ToDoLogic = ToDoLogic(lambda change, indices: None, self.fail, scheduler=lambda ms, func: None)
+        logic.update_entry_list()
+        logic.wait_idle()
+        # from this thread, its own connection, like another process
+        self.assertTrue(DatabaseManager.delete_entries([1]))
+        self.assertTrue(DatabaseManager.add_entry({"title": "c", "info": "", "date": 1, "is_done": False})[0])
+        self.assertTrue(DatabaseManager.prune_tombstones(keep=0))
+        logic.check_external_changes()
+        logic.wait_idle()
+        self.assertEqual(logic.get_entry_display_strings(), ("b", "c"))
+        logic.close()
+
+class ListCommandTest(DatabaseTestCase):
+    def test_filters(self):
+        self.assertEqual(self.cli("add", "open one"), 0)
+        self.assertEqual(self.cli("add", "done one", "--done"), 0)
+        for flag, expected in (("--open", "1\t[ ] open one\n"), ("--done", "2\t[x] done one\n"),
+                               (None, "1\t[ ] open one\n2\t[x] done one\n")):
+            with mock.patch("sys.stdout", new_callable=io.StringIO) as stdout:
+                self.assertEqual(self.cli("list", *filter(None, (flag,))), 0)
+            self.assertEqual(stdout.getvalue(), expected)
+
+class PagingTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.assertTrue(DatabaseManager.add_entries([{"title": f"{i:02}", "info": "", "date": i, "is_done": False} for i in range(1, 21)])[0])
+        self.errors: list[str] = []
+        self.logic: ToDoLogic = ToDoLogic(lambda change, indices: None, self.errors.append, page_size=5,
+                                          scheduler=lambda ms, func: None)
+        self.logic.update_entry_list()
+        self.logic.wait_idle()
+
+    def tearDown(self):
+        self.logic.close()
+        super().tearDown()
+
+    def ids(self) -> list[int]:
+        return [self.logic.get_entry(index).get_id() for index in range(len(self.logic.get_entry_display_strings()))]
+
+    def test_page_started_before_a_reload_is_dropped(self):
+        self.assertTrue(self.logic.load_next_page())
+        self.logic.remove_entry(0) # its flush makes the page read wait behind the reload
+        self.logic.set_view(ToDoLogic.ORDER_ADDED, False)
+        self.logic.wait_idle()
+        self.assertEqual(self.ids(), [2, 3, 4, 5, 6])
+        self.assertTrue(self.logic.load_next_page()) # not stuck loading
+        self.logic.wait_idle()
+        self.assertEqual(self.ids(), list(range(2, 12)))
+
+    def test_page_started_before_a_search_is_dropped(self):
+        self.assertTrue(self.logic.load_next_page())
+        self.logic.remove_entry(0)
+        self.logic.search("03")
+        self.logic.wait_idle()
+        self.assertEqual(self.ids(), [3])
+
+    def test_cache_is_consistent_after_a_delete(self):
+        self.logic.remove_entry(0)
+        self.logic.flush_changes()
+        results: list[bool] = []
+        self.logic.verify_cache(results.append)
+        self.logic.wait_idle()
+        self.assertEqual(results, [True])
+        self.assertEqual(self.ids(), [2, 3, 4, 5])
+        self.assertTrue(self.logic.has_more_after())
+
+    def test_page_asked_for_before_the_order_changed(self):
+        self.logic.set_view(ToDoLogic.ORDER_TITLE)
+        self.logic.wait_idle()
+        with mock.patch("sys.stdout", new_callable=io.StringIO) as stdout:
+            self.assertTrue(self.logic.load_next_page())
+            self.logic.set_view(ToDoLogic.ORDER_ADDED)
+            self.logic.wait_idle()
+        self.assertEqual(stdout.getvalue(), "") # no querry with a title cursor on the id order
+        self.assertEqual(self.errors, [])
+        self.assertEqual(self.ids(), [1, 2, 3, 4, 5])
+
+    def test_page_asked_for_before_the_filter_changed(self):
+        self.assertTrue(self.logic.load_next_page())
+        self.logic.set_view(ToDoLogic.ORDER_ADDED, True)
+        self.logic.wait_idle()
+        self.assertEqual(self.ids(), [])
+
+class JournalTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.assertTrue(DatabaseManager.add_entry({"title": "a", "info": "", "date": 1, "is_done": False})[0])
+        self.errors: list[str] = []
+        # the flush timer never fires, flush_changes writes when the test wants it
+        self.logic: ToDoLogic = ToDoLogic(lambda change, indices: None, self.errors.append, scheduler=lambda ms, func: None)
+        self.logic.update_entry_list()
+        self.logic.wait_idle()
+
+    def tearDown(self):
+        self.logic.close()
+        super().tearDown()
+
+    def flush(self):
+        self.logic.flush_changes()
+        self.logic.wait_idle()
+
+    def revision(self) -> int:
+        return DatabaseManager.get_revision()[1]
+
+    def rows(self) -> list[tuple]:
+        return [row[:3] for row in DatabaseManager.get_entries()[1]]
+
+    def test_toggle_back_is_not_written(self):
+        revision: int = self.revision()
+        self.logic.change_entry_status(0, True)
+        self.logic.change_entry_status(0, False)
+        self.flush()
+        self.assertEqual(self.revision(), revision)
+        self.logic.change_entry_status(0, True)
+        self.flush()
+        self.assertEqual(self.revision(), revision + 1)
+
+    def test_undo_delete_before_flush(self):
+        revision: int = self.revision()
+        self.logic.remove_entry(0)
+        self.assertTrue(self.logic.undo())
+        self.flush()
+        self.assertEqual(self.revision(), revision)
+        self.assertEqual(self.rows(), [(1, 1, "a")])
+        self.assertEqual(self.logic.get_entry_display_strings(), ("a",))
+
+    def test_undo_delete_after_flush(self):
+        self.logic.remove_entry(0)
+        self.flush()
+        self.assertEqual(self.rows(), [])
+        self.assertTrue(self.logic.undo())
+        self.flush()
+        self.assertEqual(self.rows(), [(1, 1, "a")])
+        self.assertEqual(self.logic.get_entry(0).get_id(), 1)
+
+    def test_reinsert_gets_a_new_id_when_its_id_was_taken(self):
+        self.logic.remove_entry(0)
+        self.flush()
+        self.assertTrue(DatabaseManager.execure_sql_querry(f"INSERT INTO {DatabaseManager.MAIN_TABLE} (_ID, date, title, info, is_done) VALUES (1, 2, 'taken', '', 0);", True)[0])
+        self.assertTrue(self.logic.undo())
+        self.flush()
+        rows: dict[str, int] = {title: row_id for row_id, date, title in self.rows()}
+        self.assertEqual(rows["taken"], 1)
+        self.assertNotEqual(rows["a"], 1)
+        self.assertEqual(self.logic.get_entry(0).get_id(), rows["a"])
+
+    def test_failed_flush_clears_journal(self):
+        self.logic.change_entry_status(0, True)
+        with mock.patch.object(DatabaseManager, "set_done_status", return_value=False):
+            self.flush()
+        self.assertEqual(self.errors, ["Failed To Save Changes"])
+        self.assertFalse(self.logic.can_undo())
+        self.assertFalse(self.logic.can_redo())
+        self.assertFalse(self.logic.get_done_status(0)) # reloaded from the database
+
+class WorkerFailureTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.errors: list[str] = []
+        # the scheduler never fires, wait_idle hands the results back
+        self.logic: ToDoLogic = ToDoLogic(lambda change, indices: None, self.errors.append, page_size=2,
+                                          scheduler=lambda ms, func: None)
+        self.logic.wait_idle()
+
+    def tearDown(self):
+        self.logic.close()
+        super().tearDown()
+
+    def add_rows(self, *titles: str):
+        self.assertTrue(DatabaseManager.add_entries([{"title": title, "info": "", "date": 1, "is_done": False} for title in titles])[0])
+
+    def test_paging_goes_on_after_a_failed_page(self):
+        self.add_rows("a", "b", "c", "d", "e")
+        self.logic.update_entry_list()
+        self.logic.wait_idle()
+        with mock.patch.object(DatabaseManager, "get_view", side_effect=RuntimeError("disk gone")):
+            self.assertTrue(self.logic.load_next_page())
+            self.logic.wait_idle()
+        self.assertEqual(self.errors, ["Failed To Get Entry"])
+        self.assertTrue(self.logic.load_next_page())
+        self.logic.wait_idle()
+        self.assertEqual(len(self.logic.get_entry_display_strings()), 4)
+
+    def test_watch_goes_on_after_a_failed_write(self):
+        with mock.patch.object(DatabaseManager, "purge_done", side_effect=RuntimeError("disk gone")):
+            self.logic.purge_done_entries()
+            self.logic.wait_idle()
+        self.assertEqual(self.errors, ["Failed To Remove Entries"])
+        self.add_rows("from another connection")
+        self.logic.check_external_changes()
+        self.logic.wait_idle()
+        self.assertEqual(len(self.logic.get_entry_display_strings()), 1)
+
+    def test_report_callback_runs_when_the_build_fails(self):
+        import ToDoReport
+        reports: list = []
+        with mock.patch.object(ToDoReport, "build_report", side_effect=RuntimeError("pool gone")):
+            self.logic.get_report(reports.append)
+            self.logic.wait_idle()
+        self.assertEqual(reports, [None])
+        self.assertEqual(self.errors, ["Failed To Build Report"])
+
+class ServerTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.server: ToDoServer.ToDoServer = ToDoServer.ToDoServer("127.0.0.1:0")
+        self.thread: threading.Thread = None
+
+    def start(self) -> str:
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.thread.start()
+        return self.server.get_address()
+
+    def tearDown(self):
+        if self.thread is not None:
+            self.server.stop()
+            self.thread.join(10)
+        super().tearDown()
+
+    def test_bulk_add_over_the_default_line_limit(self):
+        remote: ToDoServer.RemoteDatabase = ToDoServer.RemoteDatabase(self.start())
+        entries: list[dict] = [{"title": f"entry {i}", "info": "x" * 100, "date": i, "is_done": False} for i in range(2000)]
+        successful, ids = remote.add_entries(entries)
+        remote.close_connection()
+        self.assertTrue(successful)
+        self.assertEqual(len(ids), 2000)
+
+    def test_local_addresses(self):
+        for address in ("127.0.0.1:8765", "localhost:8765", ":8765", "unix:/tmp/todo.sock"):
+            self.assertTrue(ToDoServer.is_local_address(address), address)
+        for address in ("0.0.0.0:8765", "192.168.1.20:8765", "todo.example.com:8765"):
+            self.assertFalse(ToDoServer.is_local_address(address), address)
+
+    def test_oversized_request_is_answered(self):
+        with mock.patch.object(ToDoServer, "LINE_LIMIT", 1024):
+            host, port = self.start().rsplit(":", 1)
+        with socket.create_connection((host, int(port)), 10) as connection:
+            lines = connection.makefile("rb")
+            lines.readline() # hello
+            connection.sendall(ToDoServer.encode({"id": 7, "op": "add_entry", "args": [{"title": "x" * 5000}], "kwargs": {}}))
+            response: dict = ToDoServer.json.loads(lines.readline())
+            self.assertEqual(response["id"], 7)
+            self.assertFalse(response["ok"])
+            # the connection still takes requests
+            connection.sendall(ToDoServer.encode({"id": 8, "op": "verify_db", "args": [], "kwargs": {}}))
+            self.assertEqual(ToDoServer.json.loads(lines.readline()), {"id": 8, "ok": True, "result": True})
+
+if __name__ == "__main__":
+    unittest.main()